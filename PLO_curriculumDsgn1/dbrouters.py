@@ -1,8 +1,32 @@
+class SessionRouter:
+    """
+    Sessions อยู่ในไฟล์ sessions.sqlite3 ของตัวเอง ('sessions') จะได้ไม่แย่ง write lock กับ real.sqlite3
+    """
+    route_app_labels = {'sessions'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in self.route_app_labels:
+            return 'sessions'
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in self.route_app_labels:
+            return 'sessions'
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label in self.route_app_labels:
+            return db == 'sessions'
+        if db == 'sessions':
+            return False
+        return None
+
+
 class AuthRouter:
     """
-    บังคับให้ Django ใช้ฐานข้อมูล 'real' สำหรับ app auth, admin, sessions, contenttypes
+    บังคับให้ Django ใช้ฐานข้อมูล 'real' สำหรับ app auth, admin, contenttypes
     """
-    route_app_labels = {'auth', 'admin', 'contenttypes', 'sessions'}
+    route_app_labels = {'auth', 'admin', 'contenttypes'}
 
     def db_for_read(self, model, **hints):
         if model._meta.app_label in self.route_app_labels:
@@ -26,3 +50,15 @@ class AuthRouter:
         if app_label in self.route_app_labels:
             return db == 'real'
         return None
+
+
+class ReadOnlyRouter:
+    """
+    'example_ro' เปิด example.sqlite3 แบบอ่านอย่างเดียว: ไม่ migrate (ใช้ 'default' แทน)
+    """
+    readonly_aliases = {'example_ro'}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in self.readonly_aliases:
+            return False
+        return None
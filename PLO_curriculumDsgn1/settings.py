@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os  # อยู่ด้านบนสุด
 
+from .sqlite import READONLY_PRAGMAS, readonly_uri, sqlite_options
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'table.middleware.RequestMetricsMiddleware',   # ✅ per-request timing / query counts (outermost)
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',   # <----- เพิ่มตรงนี้
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,20 +82,82 @@ WSGI_APPLICATION = 'PLO_curriculumDsgn1.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# ✅ Both files run in WAL mode with tuned PRAGMAs (PLO_curriculumDsgn1/sqlite.py);
+#    connections are kept for CONN_MAX_AGE seconds instead of reopened per request.
+#    IMMEDIATE: atomic blocks take the write lock up front (and wait busy_timeout for it);
+#    a deferred read→write upgrade fails at once with "database is locked" under WAL.
+# ✅ 'sessions': django_session lives in sessions.sqlite3 (table.sessions), off the real DB's write lock
+# ✅ 'example_ro': view-mode pages read example.sqlite3 through a read-only connection
+#    (table.readonly); backups, syncs and CLO saves still write through 'default'.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'example.sqlite3',  # ดูอย่างเดียว
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': sqlite_options(transaction_mode='IMMEDIATE'),
     },
     'real': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'real.sqlite3',     # ใช้งานจริง
-    }
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': sqlite_options(transaction_mode='IMMEDIATE'),
+    },
+    'example_ro': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': readonly_uri(BASE_DIR / 'example.sqlite3'),  # ดูอย่างเดียว (อ่านอย่างเดียวจริง)
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': sqlite_options(READONLY_PRAGMAS),
+        'TEST': {'MIRROR': 'default'},
+    },
+    'sessions': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'sessions.sqlite3',  # sessions เท่านั้น
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': sqlite_options(transaction_mode='IMMEDIATE'),
+    },
 }
 
 
 # ✅ เพิ่มตรงนี้
-DATABASE_ROUTERS = ['PLO_curriculumDsgn1.dbrouters.AuthRouter']
+DATABASE_ROUTERS = [
+    'PLO_curriculumDsgn1.dbrouters.SessionRouter',
+    'PLO_curriculumDsgn1.dbrouters.AuthRouter',
+    'PLO_curriculumDsgn1.dbrouters.ReadOnlyRouter',
+]
+
+# ✅ Database sessions in sessions.sqlite3; expired ones are purged hourly by the store itself
+SESSION_ENGINE = 'table.sessions'
+SESSION_CLEANUP_INTERVAL = 3600
+
+# ✅ Request metrics (table.middleware) → one JSON line per request on the 'table.requests' logger
+REQUEST_METRICS = {
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_QUERY_COUNT': 50,
+    'SLOW_SQL_MS': 200,
+    'MAX_LOGGED_SQL': 50,
+}
+
+# ✅ Edit-mode saves queue per curriculum across worker processes (table.write_queue)
+WRITE_QUEUE = {
+    'DIR': BASE_DIR / 'write-locks',
+    'TIMEOUT': 10,        # seconds a save waits for its turn → then 503 + Retry-After
+    'MAX_WAITERS': 8,     # saves queued per curriculum before new ones are refused
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'table.requests': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
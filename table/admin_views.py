@@ -1,10 +1,16 @@
+import os
+
 from django.contrib.admin.views.decorators import staff_member_required
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import render
 from django.contrib import messages
+from django.db import connections
 from table.models import Curriculum
-import shutil
-import os
+from table.snapshots import database_path, snapshot_database
+from table.ksec_cache import ksec_cache_stats
+from table.journal import mark_copy_synced
+from table.chart_cache import chart_cache
+from table.write_queue import write_queue_stats
 
 
 @staff_member_required
@@ -13,13 +19,21 @@ def sync_real_to_example(request):
     Admin-only function to synchronize the entire real.sqlite3 database
     into example.sqlite3. This operation fully overwrites the example database
     with the current real database contents.
+
+    The copy is an online snapshot (SQLite backup API) built in a temporary
+    file, so concurrent writes to real.sqlite3 cannot tear it, and then
+    written into example.sqlite3 in one backup step (one write transaction):
+    readers see the old database or the new one, never a mix. The file is
+    only moved into place (os.replace) when example.sqlite3 does not exist yet.
     """
     status = ""
     if request.method == "POST":
         try:
-            source = os.path.join(os.path.dirname(__file__), '..', 'real.sqlite3')
-            dest = os.path.join(os.path.dirname(__file__), '..', 'example.sqlite3')
-            shutil.copyfile(source, dest)
+            # hold no read transaction on the example file while the copy is written into it
+            connections['default'].close()
+            snapshot_database(database_path('real'), database_path('default'))
+            # the copy carries real's journal: every curriculum is in sync up to its end
+            mark_copy_synced('default')
             status = "✅ Sync completed successfully. Data copied from real → example."
         except Exception as e:
             status = f"❌ Error occurred during sync: {str(e)}"
@@ -60,3 +74,17 @@ def sync_curriculum_example_to_real(request, curriculum_id):
         status = f"❌ Error during synchronization: {str(e)}"
 
     return render(request, 'admin/sync_result.html', {'status': status})
+
+
+@staff_member_required
+def cache_stats(request):
+    """
+    Admin-only JSON view of this worker process's in-memory caches
+    (entries, hits, misses, hit rate) and write-queue statistics.
+    """
+    return JsonResponse({
+        'pid': os.getpid(),
+        'ksec_dictionary': ksec_cache_stats(),
+        'plo_graph': chart_cache.stats(),
+        'write_queue': write_queue_stats(),
+    })
@@ -0,0 +1,118 @@
+from functools import cached_property
+
+from django.db.models import Q, Sum
+
+from .models import CreditRow, CoursePLO, parse_plo_tags
+
+
+SEMESTERS = range(1, 9)
+
+# Courses that count towards the PLO credit matrix on the credit table
+# (General/Core rows + Free Electives)
+COUNTED_COURSES = (
+    Q(course__credit_row__row_type__in=['general', 'core']) |
+    Q(course__category='free_elective')
+)
+
+
+def plo_row_tag(row):
+    """Return the normalized PLO tag of a PLO row, e.g. 'PLO1: Apply ...' -> 'PLO1'."""
+    tags = parse_plo_tags(row.name)
+    return tags[0] if tags else ''
+
+
+class CreditMatrix:
+    """
+    PLO × semester credit aggregates for one curriculum.
+
+    All CreditRows are loaded with one query and all course credits with one
+    grouped query over the CoursePLO links (per PLO tag and semester);
+    everything else is derived in memory. Both loads are lazy, so callers
+    that only need the rows (e.g. the PLO graph) never touch the Course table.
+    """
+
+    def __init__(self, curriculum_id, db):
+        self.curriculum_id = curriculum_id
+        self.db = db
+
+    # ---------- CreditRow side ----------
+    @cached_property
+    def rows(self):
+        return list(CreditRow.objects.using(self.db).filter(
+            curriculum_id=self.curriculum_id
+        ).order_by('id'))
+
+    def rows_of(self, row_type):
+        """Rows of one type, in display order (sort_order, id)."""
+        rows = [row for row in self.rows if row.row_type == row_type]
+        if row_type in ('general', 'core'):
+            rows.sort(key=lambda row: (row.sort_order, row.id))
+        return rows
+
+    @cached_property
+    def plo_rows(self):
+        return self.rows_of('plo')
+
+    @cached_property
+    def total_row_credits(self):
+        return sum(row.total_credits() for row in self.rows)
+
+    @cached_property
+    def plo_percentages(self):
+        """Share of each PLO row in all planned credits, keyed by str(row.id)."""
+        total = self.total_row_credits
+        return {
+            str(row.id): round((row.total_credits() / total) * 100, 2) if total else 0
+            for row in self.plo_rows
+        }
+
+    # ---------- Course side ----------
+    @cached_property
+    def _course_credits(self):
+        """{(plo, semester): (all credits, credits counted on the credit table)}"""
+        grouped = CoursePLO.objects.using(self.db).filter(
+            curriculum_id=self.curriculum_id
+        ).values('plo', 'course__semester').annotate(
+            total=Sum('course__credits'),
+            counted=Sum('course__credits', filter=COUNTED_COURSES),
+        ).order_by()
+
+        return {
+            (item['plo'], item['course__semester']): (item['total'] or 0, item['counted'] or 0)
+            for item in grouped
+        }
+
+    def course_credits(self, plo_tag, semester, counted_only=False):
+        """Course credits for one PLO tag in one semester."""
+        total, counted = self._course_credits.get((plo_tag, semester), (0, 0))
+        return counted if counted_only else total
+
+    def plo_total(self, plo_tag):
+        """Course credits for one PLO tag across all semesters."""
+        return sum(self.course_credits(plo_tag, sem) for sem in SEMESTERS)
+
+    @cached_property
+    def plo_course_totals(self):
+        """Counted course credits keyed by "<row id>_<semester>" (template keys)."""
+        totals = {}
+        for row in self.plo_rows:
+            if row.name:
+                plo_tag = plo_row_tag(row)
+                for sem in SEMESTERS:
+                    totals[f"{row.id}_{sem}"] = self.course_credits(plo_tag, sem, counted_only=True)
+        return totals
+
+    @cached_property
+    def plo_semester_totals(self):
+        totals = {sem: 0 for sem in SEMESTERS}
+        for key, value in self.plo_course_totals.items():
+            _, sem = key.split('_')
+            totals[int(sem)] += value
+        return totals
+
+    def plo_rows_with_credits(self, semester):
+        """PLO rows that have at least one credited course in the semester."""
+        return [
+            row for row in self.plo_rows
+            if self.course_credits(plo_row_tag(row), semester) > 0
+        ]
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class TableConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'table'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from .readonly import close_replaced_connections, remember_file_identity
+
+        # ✅ reopen SQLite connections whose database file was replaced (e.g. example.sqlite3 restored)
+        connection_created.connect(remember_file_identity, dispatch_uid='table.readonly.identity')
+        request_started.connect(close_replaced_connections, dispatch_uid='table.readonly.replaced')
@@ -0,0 +1,74 @@
+"""
+In-process cache of rendered chart images, keyed by a hash of the data drawn.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+CHART_CACHE_SIZE = 64    # rendered images kept per process (LRU)
+
+# Bump when the chart drawing changes, so old images are not served for the same data
+CHART_VERSION = 2
+
+
+def chart_key(*data):
+    """SHA-256 of the (JSON-serialisable) data a chart is drawn from."""
+    payload = json.dumps([CHART_VERSION, *data], separators=(',', ':'), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RenderCache:
+    """Bounded LRU of key → bytes. Safe to share between threads."""
+
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def get_or_render(self, key, render):
+        """Cached bytes for `key`, calling `render()` (outside the lock) on a miss."""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            size = len(self._items)
+        lookups = self.hits + self.misses
+        return {
+            'entries': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+chart_cache = RenderCache()
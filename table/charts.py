@@ -0,0 +1,165 @@
+"""
+Chart rendering, off the request thread and off pyplot.
+
+Charts are drawn with the object-oriented Figure/Agg API (no pyplot global
+state) in up to RENDER_WORKERS long-lived render processes, so rendering uses
+other cores and a slow chart cannot hold a web worker for longer than
+RENDER_TIMEOUT. A render that overruns is stopped by killing its own process;
+renders in the other processes carry on.
+This module must not import Django: render processes import it on their own.
+matplotlib and numpy are imported inside the drawing functions, so only the
+render processes load them, never the web workers.
+"""
+
+import multiprocessing
+import threading
+import time
+from io import BytesIO
+
+
+RENDER_WORKERS = 2       # processes drawing charts
+RENDER_QUEUE = 4         # renders allowed to wait on top of the running ones
+RENDER_TIMEOUT = 10      # seconds a request waits for its chart, queueing included
+
+YEAR_LABELS = ['Year 1', 'Year 2', 'Year 3', 'Year 4']
+YEAR_COLORS = ['#43a047', '#1976d2', '#fbc02d', '#d81b60']
+
+
+class ChartRenderError(Exception):
+    """The chart could not be rendered in time (renderer busy, timed out or crashed)."""
+
+
+# ---------- Drawing (runs in a render process) ----------
+def figure_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
+
+
+def draw_plo_graph(plo_labels, plo_values):
+    """PNG bytes of the stacked PLO-credits-by-year bar chart."""
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    # Handle no data
+    if len(plo_labels) == 0:
+        fig = Figure(figsize=(10, 5))
+        ax = fig.add_subplot()
+        ax.axis('off')
+        ax.text(0.5, 0.5, 'No PLO data available for graph', fontsize=28, color='red',
+                ha='center', va='center', transform=ax.transAxes)
+        return figure_png(fig)
+
+    # Prepare year sums: (8, n_plo) → (4, n_plo)
+    semesters = np.array(plo_values, dtype=float).T
+    year_data = semesters[0::2] + semesters[1::2]
+
+    ind = np.arange(len(plo_labels))
+    bottom = np.zeros(len(plo_labels))
+
+    fig = Figure(figsize=(12, 5))
+    ax = fig.add_subplot()
+    for label, color, credits in zip(YEAR_LABELS, YEAR_COLORS, year_data):
+        ax.bar(ind, credits, bottom=bottom, label=label, color=color)
+        bottom += credits
+    ax.set_xticks(ind, plo_labels)
+    ax.set_xlabel('PLO')
+    ax.set_ylabel('Total Credits')
+    ax.set_title('PLO Credit Distribution by Year (Stacked Bar)')
+    ax.legend(title="Year")
+    fig.tight_layout()
+    return figure_png(fig)
+
+
+# ---------- Workers (request side) ----------
+class Worker:
+    """One render process and the pipe to it; it draws one chart at a time."""
+
+    def __init__(self):
+        # spawn: never fork a process that holds DB connections and server threads
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=serve, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+def serve(conn):
+    """Render process main loop: run each (func, args) received and send back (ok, result)."""
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = (True, func(*args))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:       # unpicklable result or exception
+            conn.send((False, RuntimeError(repr(e))))
+
+
+_idle = []                   # started workers with nothing to draw
+_idle_lock = threading.Lock()
+_running = threading.BoundedSemaphore(RENDER_WORKERS)
+_admitted = threading.BoundedSemaphore(RENDER_WORKERS + RENDER_QUEUE)
+
+
+def checkout():
+    with _idle_lock:
+        while _idle:
+            worker = _idle.pop()
+            if worker.process.is_alive():
+                return worker
+            worker.kill()
+    return Worker()
+
+
+def checkin(worker):
+    with _idle_lock:
+        _idle.append(worker)
+
+
+def render(func, *args, timeout=RENDER_TIMEOUT):
+    """
+    Run `func(*args)` in a render process and return its result, or raise
+    ChartRenderError. A render finding RENDER_QUEUE others already waiting
+    is refused at once; otherwise waiting and drawing together get `timeout`
+    seconds. A render that overruns kills its own process only.
+    """
+    deadline = time.monotonic() + timeout
+    if not _admitted.acquire(blocking=False):
+        raise ChartRenderError('Chart renderer is busy')
+    try:
+        if not _running.acquire(timeout=timeout):
+            raise ChartRenderError(f'Chart renderer is busy (no free worker within {timeout}s)')
+        try:
+            worker = checkout()
+            try:
+                worker.conn.send((func, args))
+                if not worker.conn.poll(max(0, deadline - time.monotonic())):
+                    worker.kill()
+                    raise ChartRenderError(f'Chart rendering took longer than {timeout}s')
+                ok, result = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                raise ChartRenderError('Chart renderer crashed')
+            checkin(worker)
+            if not ok:
+                raise result
+            return result
+        finally:
+            _running.release()
+    finally:
+        _admitted.release()
+
+
+def render_plo_graph(plo_labels, plo_values):
+    return render(draw_plo_graph, plo_labels, plo_values)
@@ -0,0 +1,179 @@
+"""
+Helpers for the database download endpoints.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .snapshots import backup_into
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Content-addressed snapshots served by the per-database download endpoint
+SNAPSHOT_DIR = Path(tempfile.gettempdir()) / 'plo-db-downloads'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class ZipChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink: zipfile writes into it, the generator drains it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files):
+    """
+    Yield a deflated zip archive chunk by chunk.
+
+    `files` is a list of (archive name, callable returning an open binary file).
+    Each file is read CHUNK_SIZE bytes at a time, so memory stays flat whatever
+    the file sizes. A manifest.json with size and SHA-256 per file is added last.
+    """
+    sink = ZipChunkBuffer()
+    manifest = []
+
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, open_file in files:
+            sha256 = hashlib.sha256()
+            size = 0
+            with open_file() as source, archive.open(name, 'w', force_zip64=True) as dest:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                    dest.write(chunk)
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            manifest.append({'name': name, 'size': size, 'sha256': sha256.hexdigest()})
+
+        archive.writestr('manifest.json', json.dumps({
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'files': manifest,
+        }, indent=2))
+
+    yield sink.drain()
+
+
+# ---------- Conditional / ranged single-file downloads ----------
+_snapshots = {}   # live path -> (stamp, etag, snapshot path)
+_snapshots_lock = threading.Lock()
+
+
+def file_stamp(path):
+    """(mtime_ns, size) of the database file and of its WAL file, if any."""
+    stamp = []
+    for candidate in (Path(path), Path(f'{path}-wal')):
+        try:
+            st = candidate.stat()
+        except FileNotFoundError:
+            continue
+        stamp.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def cached_snapshot(path):
+    """
+    Return (etag, snapshot path, last modified timestamp) for a live database.
+
+    A new snapshot is taken and hashed only when the file (or its WAL) changed
+    since the last call; otherwise the cached one is reused. Snapshots are named
+    by content hash, so every worker that snapshots the same data serves the
+    same bytes under the same ETag, and a resumed Range request stays valid.
+    """
+    path = Path(path)
+    stamp = file_stamp(path)
+    last_modified = max(mtime for mtime, _ in stamp) / 1e9
+
+    with _snapshots_lock:
+        cached = _snapshots.get(path)
+        if cached and cached[0] == stamp and cached[2].exists():
+            return cached[1], cached[2], last_modified
+
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            backup_into(path, tmp_path)
+            digest = file_sha256(tmp_path)
+            snapshot = SNAPSHOT_DIR / f'{path.stem}-{digest[:32]}.sqlite3'
+            os.replace(tmp_path, snapshot)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        # older snapshots of this file are no longer served (open handles keep them readable)
+        if cached and cached[2] != snapshot:
+            cached[2].unlink(missing_ok=True)
+
+        etag = f'"{digest}"'
+        _snapshots[path] = (stamp, etag, snapshot)
+        return etag, snapshot, last_modified
+
+
+def parse_range(header, size):
+    """
+    Parse a single "bytes=start-end" range against `size`.
+    Returns (start, end) inclusive, None to ignore the header (send the whole file),
+    or False when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None  # malformed or multi-range: serve the full file
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def iter_file_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,318 @@
+"""
+Drift detection between the real and example copies of a curriculum.
+
+Every database keeps SyncDigest rows per curriculum, forming a two-level
+Merkle tree: each row of a journaled table is hashed, the row hashes of
+DIGEST_BUCKET consecutive ids form a bucket digest, and all bucket digests
+form the curriculum's root digest. In a journaled database (real) the
+digests are brought up to date from its ChangeJournal, so only buckets with
+changed rows are hashed again, and the entries read are then pruned
+(journal.prune_journal); other databases (example) are hashed in full. Two
+copies are in sync when their root digests are equal; when they are not,
+only the buckets whose digests differ are copied again.
+
+Saving one course's CLOs only needs that course to match: course_digest()
+hashes the course's own subtree (COURSE_SUBTREE), and resync_course()
+copies just that subtree.
+"""
+
+import hashlib
+from collections import defaultdict
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+
+from .journal import JOURNALED, batches, has_journal, last_change_id, prune_journal
+from .models import (
+    CLO, CLOKSEC, CLOSummary, ChangeJournal, Course, CourseKSEC, CoursePLO, Curriculum, KSECItem, SyncDigest,
+)
+from .plo_summaries import course_plo_tags, refresh_plo_summaries
+from .replication import ATTACH_SCHEMA, can_attach, curriculum_where, replicate_curriculum
+
+
+DIGEST_BUCKET = 256      # consecutive primary keys per bucket
+
+ROOT = ''                # SyncDigest.table_name of the root row
+ROOT_BUCKET = -1
+
+JOURNALED_TABLES = {model._meta.db_table: (model, lookup) for model, lookup in JOURNALED}
+
+# One course's rows, compared by content: (model, lookup of the course id, fields).
+# Surrogate ids of the rows under a course (credit row, CLOs, KSEC items) are
+# numbered separately in each database, so links are compared through the
+# CLO index and the KSEC code (category, type, sort order) instead.
+KSEC_CODE = ['category_type', 'type', 'sort_order']
+COURSE_SUBTREE = [
+    (Course, 'id', ['id', 'curriculum_id', 'category', 'semester', 'course_code', 'course_name', 'credits',
+                    'plo', 'description', 'knowledge', 'skills', 'ethics', 'character']),
+    (CourseKSEC, 'course_id', [f'ksec_item__{field}' for field in KSEC_CODE]),
+    (CLO, 'course_id', ['index', 'clo', 'bloom', 'k', 's', 'e', 'c']),
+    (CLOKSEC, 'clo__course_id', ['clo__index'] + [f'ksec_item__{field}' for field in KSEC_CODE]),
+    (CLOSummary, 'course_id', ['bloom_score', 'k_percent', 's_percent', 'e_percent', 'c_percent']),
+    (CoursePLO, 'course_id', ['plo']),
+]
+
+
+def row_digest(row):
+    return hashlib.sha256(repr(row).encode()).digest()
+
+
+def bucket_digest(rows):
+    sha256 = hashlib.sha256()
+    for row in rows:
+        sha256.update(row_digest(row))
+    return sha256.hexdigest()
+
+
+def root_digest(buckets):
+    """Digest over {(table, bucket): digest}, independent of row ids' insertion order."""
+    sha256 = hashlib.sha256()
+    for (table, bucket), digest in sorted(buckets.items()):
+        sha256.update(f'{table}:{bucket}:{digest}\n'.encode())
+    return sha256.hexdigest()
+
+
+def hash_table(db, model, lookup, curriculum_id, buckets=None):
+    """
+    {bucket: digest} of one table's rows of the curriculum, for every bucket
+    or only for `buckets`. Buckets without rows are absent from the result.
+    """
+    columns = [field.attname for field in model._meta.concrete_fields]
+    pk_index = columns.index(model._meta.pk.attname)
+
+    rows = model.objects.using(db).filter(**{lookup: curriculum_id})
+    if buckets is not None:
+        ranges = Q()
+        for bucket in buckets:
+            ranges |= Q(pk__gte=bucket * DIGEST_BUCKET, pk__lt=(bucket + 1) * DIGEST_BUCKET)
+        rows = rows.filter(ranges)
+
+    grouped = defaultdict(list)
+    for row in rows.order_by('pk').values_list(*columns):
+        grouped[row[pk_index] // DIGEST_BUCKET].append(row)
+    return {bucket: bucket_digest(rows) for bucket, rows in grouped.items()}
+
+
+def changed_buckets(db, curriculum_id, since, through):
+    """{table: {bucket}} touched by journal entries (since, through] of the curriculum."""
+    changed = defaultdict(set)
+    entries = ChangeJournal.objects.using(db).filter(
+        curriculum_id=curriculum_id, id__gt=since, id__lte=through,
+    ).values_list('table_name', 'row_id').distinct()
+    for table, row_id in entries:
+        changed[table].add(row_id // DIGEST_BUCKET)
+    return changed
+
+
+def refresh_digests(db, curriculum_id, full=False):
+    """
+    Bring `db`'s digests of one curriculum up to date and return the root digest.
+
+    Nothing is hashed when the journal has not moved since the last refresh;
+    otherwise only the buckets it touched are. Databases without a journal
+    (or `full=True`) are hashed completely.
+    """
+    with transaction.atomic(using=db):
+        journaled = has_journal(connections[db])
+        through = last_change_id(db) if journaled else 0
+        digests = SyncDigest.objects.using(db).filter(curriculum_id=curriculum_id)
+        root = digests.filter(table_name=ROOT, bucket=ROOT_BUCKET).first()
+
+        if root is None or not journaled or full:
+            digests.delete()
+            fresh = [
+                SyncDigest(curriculum_id=curriculum_id, table_name=table, bucket=bucket, digest=digest)
+                for table, (model, lookup) in JOURNALED_TABLES.items()
+                for bucket, digest in hash_table(db, model, lookup, curriculum_id).items()
+            ]
+        elif root.through_change_id == through:
+            return root.digest
+        else:
+            changed = changed_buckets(db, curriculum_id, root.through_change_id, through)
+            fresh = []
+            for table, buckets in changed.items():
+                if table not in JOURNALED_TABLES:
+                    continue
+                model, lookup = JOURNALED_TABLES[table]
+                for chunk in batches(sorted(buckets)):
+                    digests.filter(table_name=table, bucket__in=chunk).delete()
+                    fresh += [
+                        SyncDigest(curriculum_id=curriculum_id, table_name=table, bucket=bucket, digest=digest)
+                        for bucket, digest in hash_table(db, model, lookup, curriculum_id, chunk).items()
+                    ]
+        SyncDigest.objects.using(db).bulk_create(fresh)
+
+        buckets = bucket_digests(db, curriculum_id)
+        digest = root_digest(buckets)
+        SyncDigest.objects.using(db).update_or_create(
+            curriculum_id=curriculum_id, table_name=ROOT, bucket=ROOT_BUCKET,
+            defaults={'digest': digest, 'through_change_id': through},
+        )
+        if journaled:
+            prune_journal(db, curriculum_id)
+    return digest
+
+
+def bucket_digests(db, curriculum_id):
+    """{(table, bucket): digest} as stored (call refresh_digests first)."""
+    rows = SyncDigest.objects.using(db).filter(curriculum_id=curriculum_id).exclude(table_name=ROOT)
+    return {(table, bucket): digest for table, bucket, digest in rows.values_list('table_name', 'bucket', 'digest')}
+
+
+def find_drift(curriculum_id, source, target):
+    """
+    Buckets [(table, bucket)] where `target`'s copy of the curriculum differs
+    from `source`'s; empty when both copies hold the same rows.
+    """
+    if refresh_digests(source, curriculum_id) == refresh_digests(target, curriculum_id):
+        return []
+
+    ours, theirs = bucket_digests(source, curriculum_id), bucket_digests(target, curriculum_id)
+    return sorted(key for key in ours.keys() | theirs.keys() if ours.get(key) != theirs.get(key))
+
+
+def resync_buckets(curriculum_id, source, target, drift):
+    """
+    Copy the drifted buckets of one curriculum from `source` into `target`:
+    each bucket's rows are deleted from `target` (children first) and copied
+    from `source` (parents first) in one target transaction. Falls back to
+    a full replication when the files cannot be attached or the buckets do
+    not line up. Returns {model name: rows copied}.
+    """
+    if not can_attach(source, target):
+        return replicate_curriculum(curriculum_id, source, target)
+
+    by_table = defaultdict(list)
+    for table, bucket in drift:
+        by_table[table].append(bucket)
+    models = [(model, lookup) for model, lookup in JOURNALED if model._meta.db_table in by_table]
+
+    connection = connections[target]
+    source_file = str(connections[source].settings_dict['NAME'])
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute(f'ATTACH DATABASE %s AS {ATTACH_SCHEMA}', [source_file])
+    try:
+        with transaction.atomic(using=target), connection.cursor() as cursor:
+            for model, lookup in reversed(models):
+                if model is Curriculum:
+                    continue   # updated in place below, never deleted
+                for bucket in by_table[model._meta.db_table]:
+                    cursor.execute(
+                        f'DELETE FROM main."{model._meta.db_table}" '
+                        f'WHERE {curriculum_where(model, lookup, "main")} AND {bucket_where(model)}',
+                        [curriculum_id, *bucket_range(bucket)],
+                    )
+
+            counts = {}
+            for model, lookup in models:
+                table = model._meta.db_table
+                columns = [field.column for field in model._meta.concrete_fields]
+                column_sql = ', '.join(f'"{column}"' for column in columns)
+                upsert = ''
+                if model is Curriculum:
+                    updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c != 'id')
+                    upsert = f' ON CONFLICT("id") DO UPDATE SET {updates}'
+                counts[model.__name__] = 0
+                for bucket in by_table[table]:
+                    cursor.execute(
+                        f'INSERT INTO main."{table}" ({column_sql}) '
+                        f'SELECT {column_sql} FROM {ATTACH_SCHEMA}."{table}" '
+                        f'WHERE {curriculum_where(model, lookup, ATTACH_SCHEMA)} AND {bucket_where(model)}'
+                        f'{upsert}',
+                        [curriculum_id, *bucket_range(bucket)],
+                    )
+                    counts[model.__name__] += cursor.rowcount
+    except IntegrityError:
+        counts = None   # rows outside the drifted buckets disagree too → full copy below
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DETACH DATABASE {ATTACH_SCHEMA}')
+
+    if counts is None:
+        return replicate_curriculum(curriculum_id, source, target)
+    return counts
+
+
+def bucket_where(model):
+    return f'"{model._meta.pk.column}" >= %s AND "{model._meta.pk.column}" < %s'
+
+
+def bucket_range(bucket):
+    return bucket * DIGEST_BUCKET, (bucket + 1) * DIGEST_BUCKET
+
+
+# ---------- One course ----------
+class CourseResyncError(Exception):
+    """The course cannot be copied on its own (missing from the target, or KSEC items differ)."""
+
+
+def course_subtree(db, course_id):
+    """{model: sorted content rows} of one course's subtree in `db`."""
+    return {
+        model: sorted(model.objects.using(db).filter(**{lookup: course_id}).values_list(*fields), key=repr)
+        for model, lookup, fields in COURSE_SUBTREE
+    }
+
+
+def course_digest(db, course_id):
+    """Digest of one course's subtree in `db`; None when `db` does not have the course."""
+    subtree = course_subtree(db, course_id)
+    if not subtree[Course]:
+        return None
+    sha256 = hashlib.sha256()
+    for model, rows in subtree.items():
+        sha256.update(f'{model._meta.db_table}\n'.encode())
+        for row in rows:
+            sha256.update(row_digest(row))
+    return sha256.hexdigest()
+
+
+def resync_course(course_id, source, target):
+    """
+    Make `target`'s copy of one course's subtree match `source`'s: the course
+    row is updated in place (it keeps its credit row), its CLOs, KSEC links,
+    summary and PLO links are recreated, and the PLO summaries of its old
+    and new PLOs are rebuilt. Raises CourseResyncError when the course or
+    one of its KSEC items is missing from `target`; that needs a backup.
+    """
+    with transaction.atomic(using=source), transaction.atomic(using=target):
+        subtree = course_subtree(source, course_id)
+        course_fields = COURSE_SUBTREE[0][2]
+        if not Course.objects.using(target).filter(id=course_id).exists():
+            raise CourseResyncError(f"Course {course_id} is missing from '{target}'.")
+        curriculum_id = subtree[Course][0][course_fields.index('curriculum_id')]
+        items = {
+            tuple(code): item_id for *code, item_id in
+            KSECItem.objects.using(target).filter(curriculum_id=curriculum_id).values_list(*KSEC_CODE, 'id')
+        }
+
+        def item_id(code):
+            if tuple(code) not in items:
+                raise CourseResyncError(f"KSEC item {code} is missing from '{target}'.")
+            return items[tuple(code)]
+
+        old_tags = course_plo_tags(target, [course_id])
+        for model, lookup, _ in reversed(COURSE_SUBTREE[1:]):
+            model.objects.using(target).filter(**{lookup: course_id}).delete()
+        Course.objects.using(target).filter(id=course_id).update(
+            **dict(zip(course_fields[1:], subtree[Course][0][1:]))
+        )
+        CourseKSEC.objects.using(target).bulk_create([
+            CourseKSEC(course_id=course_id, ksec_item_id=item_id(code)) for code in subtree[CourseKSEC]
+        ])
+        clo_fields = COURSE_SUBTREE[2][2]
+        clos = CLO.objects.using(target).bulk_create([
+            CLO(course_id=course_id, **dict(zip(clo_fields, row))) for row in subtree[CLO]
+        ])
+        clo_ids = {clo.index: clo.id for clo in clos}
+        CLOKSEC.objects.using(target).bulk_create([
+            CLOKSEC(clo_id=clo_ids[index], ksec_item_id=item_id(code)) for index, *code in subtree[CLOKSEC]
+        ])
+        CLOSummary.objects.using(target).bulk_create([
+            CLOSummary(course_id=course_id, **dict(zip(COURSE_SUBTREE[4][2], row))) for row in subtree[CLOSummary]
+        ])
+        CoursePLO.objects.using(target).bulk_create([
+            CoursePLO(curriculum_id=curriculum_id, course_id=course_id, plo=plo) for plo, in subtree[CoursePLO]
+        ])
+        refresh_plo_summaries(target, curriculum_id, old_tags | {plo for plo, in subtree[CoursePLO]})
@@ -0,0 +1,262 @@
+"""
+Change journal: SQLite triggers that append one ChangeJournal row per
+insert/update/delete on every curriculum table, tagged with the curriculum
+the row belongs to. Only the databases in JOURNAL_DATABASES (real) get
+triggers. Backups replay real's journal into example; table.drift reads it
+to keep real's content digests current (example's are hashed in full).
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, connections, transaction
+
+from .models import Curriculum, ChangeJournal, SyncCursor, SyncDigest
+from .replication import (
+    ATTACH_SCHEMA, BATCH_SIZE, CURRICULUM_GRAPH, can_attach, curriculum_where, replicate_curriculum,
+)
+
+
+JOURNAL_DATABASES = ['real']
+
+# Source → target of the backups (sync_curriculum): the source's journal is
+# kept until the target's cursor has passed it
+SYNC_TARGETS = {'real': 'default'}
+
+JOURNALED = [(Curriculum, 'id')] + CURRICULUM_GRAPH
+
+OPS = {'INSERT': ('I', 'NEW'), 'UPDATE': ('U', 'NEW'), 'DELETE': ('D', 'OLD')}
+
+
+def curriculum_expr(model, lookup, row, depth=0):
+    """
+    SQL giving the curriculum id of trigger row `row` ('NEW'/'OLD'), e.g.
+    CLO / 'course__curriculum_id' ->
+    (SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = NEW."course_id")
+    """
+    *path, column = lookup.split('__')
+    if not path:
+        return f'{row}."{column}"'
+
+    field = model._meta.get_field(path[0])
+    related = field.related_model
+    alias = f'p{depth}'
+    inner = curriculum_expr(related, '__'.join(path[1:] + [column]), alias, depth + 1)
+    return (
+        f'(SELECT {inner} FROM "{related._meta.db_table}" AS {alias} '
+        f'WHERE {alias}."{related._meta.pk.column}" = {row}."{field.column}")'
+    )
+
+
+def trigger_name(table, event):
+    return f'{table}_journal_{event.lower()}'
+
+
+def journal_triggers(model, lookup):
+    """CREATE TRIGGER statements (insert/update/delete) for one model."""
+    table = model._meta.db_table
+    journal = ChangeJournal._meta.db_table
+    statements = []
+    for event, (op, row) in OPS.items():
+        statements.append(
+            f'CREATE TRIGGER IF NOT EXISTS "{trigger_name(table, event)}" '
+            f'AFTER {event} ON "{table}" FOR EACH ROW BEGIN '
+            f'INSERT INTO "{journal}" ("curriculum_id", "table_name", "row_id", "op") '
+            f"VALUES ({curriculum_expr(model, lookup, row)}, '{table}', {row}.\"{model._meta.pk.column}\", '{op}'); "
+            f'END'
+        )
+    return statements
+
+
+def install_journal(connection):
+    with connection.cursor() as cursor:
+        for model, lookup in JOURNALED:
+            for statement in journal_triggers(model, lookup):
+                cursor.execute(statement)
+
+
+def drop_journal(connection):
+    with connection.cursor() as cursor:
+        for model, _ in JOURNALED:
+            for event in OPS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS "{trigger_name(model._meta.db_table, event)}"')
+
+
+def has_journal(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+            [trigger_name(Curriculum._meta.db_table, 'INSERT')],
+        )
+        return cursor.fetchone() is not None
+
+
+# ---------- Incremental sync ----------
+def last_change_id(db):
+    """
+    Id of the last change journaled in `db`. Read from sqlite_sequence
+    (the journal's AUTOINCREMENT counter), so pruned entries still count.
+    """
+    with connections[db].cursor() as cursor:
+        cursor.execute('SELECT "seq" FROM sqlite_sequence WHERE "name" = %s', [ChangeJournal._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def set_sync_cursor(db, curriculum_id, change_id):
+    SyncCursor.objects.using(db).update_or_create(
+        curriculum_id=curriculum_id, defaults={'last_change_id': change_id}
+    )
+
+
+def mark_copy_synced(db):
+    """
+    After a whole-file copy of the journaled database into `db`, every
+    curriculum in it is current up to the journal that came with the copy.
+    When `db` is not journaled itself, the triggers and entries that came
+    with the copy are removed.
+    """
+    through = last_change_id(db)
+    for curriculum_id in Curriculum.objects.using(db).values_list('id', flat=True):
+        set_sync_cursor(db, curriculum_id, through)
+    if db not in JOURNAL_DATABASES:
+        drop_journal(connections[db])
+        ChangeJournal.objects.using(db).all().delete()
+
+
+def prune_journal(db, curriculum_id):
+    """
+    Delete `db`'s journal entries of one curriculum that every reader has
+    consumed: `db`'s own digests (table.drift) and the sync cursor of its
+    SYNC_TARGETS database. A reader without a position yet starts from a
+    full hash or copy, so it holds nothing back. Returns the rows deleted.
+    """
+    from .drift import ROOT, ROOT_BUCKET   # table.drift imports this module
+
+    positions = [
+        SyncDigest.objects.using(db).filter(
+            curriculum_id=curriculum_id, table_name=ROOT, bucket=ROOT_BUCKET
+        ).values_list('through_change_id', flat=True).first()
+    ]
+    if db in SYNC_TARGETS:
+        positions.append(SyncCursor.objects.using(SYNC_TARGETS[db]).filter(
+            curriculum_id=curriculum_id
+        ).values_list('last_change_id', flat=True).first())
+
+    entries = ChangeJournal.objects.using(db).filter(curriculum_id=curriculum_id)
+    positions = [position for position in positions if position is not None]
+    if positions:
+        entries = entries.filter(id__lte=min(positions))
+    return entries.delete()[0]
+
+
+def sync_curriculum(curriculum_id, source, target):
+    """
+    Bring `target`'s copy of one curriculum up to date with `source`.
+
+    When `source` is journaled and `target` has a SyncCursor for the
+    curriculum, only the rows changed since then are re-copied. Otherwise
+    (first sync, no journal, or rows that no longer line up) the whole
+    curriculum is replicated and the cursor set. The source's journal entries
+    the cursor has passed are then pruned (prune_journal).
+    Returns (counts, incremental).
+    """
+    journaled = can_attach(source, target) and has_journal(connections[source])
+    if journaled:
+        since = SyncCursor.objects.using(target).filter(
+            curriculum_id=curriculum_id
+        ).values_list('last_change_id', flat=True).first()
+        if since is not None:
+            try:
+                counts = replay_journal(curriculum_id, source, target, since)
+                prune_journal(source, curriculum_id)
+                return counts, True
+            except IntegrityError:
+                pass   # target drifted from the journal → full copy below
+
+    # read before copying: anything journaled meanwhile is replayed (again) next time
+    through = last_change_id(source) if journaled else None
+    counts = replicate_curriculum(curriculum_id, source, target)
+    if through is not None:
+        set_sync_cursor(target, curriculum_id, through)
+        prune_journal(source, curriculum_id)
+    return counts, False
+
+
+def replay_journal(curriculum_id, source, target, since):
+    """
+    Re-copy the rows journaled for `curriculum_id` after change `since`:
+    each changed row is deleted from `target` (children first) and inserted
+    again from `source` (parents first) if it still exists there. Rows of
+    the changed tables that only `target` has (e.g. the CLOs a CLO save
+    numbered there) are deleted too, which realigns its ids with `source`.
+    Deletes and inserts only touch rows of this curriculum: a changed row
+    whose id another curriculum holds in `target` fails the insert
+    (IntegrityError) instead of replacing that row.
+    One target transaction; the cursor moves in the same transaction.
+    """
+    connection = connections[target]
+    source_file = str(connections[source].settings_dict['NAME'])
+    journal = ChangeJournal._meta.db_table
+
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute(f'ATTACH DATABASE %s AS {ATTACH_SCHEMA}', [source_file])
+    try:
+        with transaction.atomic(using=target), connection.cursor() as cursor:
+            cursor.execute(f'SELECT "seq" FROM {ATTACH_SCHEMA}.sqlite_sequence WHERE "name" = %s', [journal])
+            row = cursor.fetchone()
+            through = row[0] if row else since
+
+            cursor.execute(
+                f'SELECT DISTINCT "table_name", "row_id" FROM {ATTACH_SCHEMA}."{journal}" '
+                f'WHERE "curriculum_id" = %s AND "id" > %s AND "id" <= %s',
+                [curriculum_id, since, through],
+            )
+            changed = defaultdict(list)
+            for table, row_id in cursor.fetchall():
+                changed[table].append(row_id)
+
+            models = [model for model, _ in JOURNALED if model._meta.db_table in changed]
+            lookups = dict(JOURNALED)
+            for model in reversed(models):
+                table, pk, lookup = model._meta.db_table, model._meta.pk.column, lookups[model]
+                for ids in batches(changed[table]):
+                    cursor.execute(
+                        f'DELETE FROM main."{table}" WHERE {curriculum_where(model, lookup, "main")} '
+                        f'AND "{pk}" IN ({", ".join(["%s"] * len(ids))})',
+                        [curriculum_id, *ids],
+                    )
+                if model is not Curriculum:
+                    cursor.execute(
+                        f'DELETE FROM main."{table}" WHERE {curriculum_where(model, lookup, "main")} '
+                        f'AND "{pk}" NOT IN (SELECT "{pk}" FROM {ATTACH_SCHEMA}."{table}" '
+                        f'WHERE {curriculum_where(model, lookup, ATTACH_SCHEMA)})',
+                        [curriculum_id, curriculum_id],
+                    )
+
+            counts = {}
+            for model in models:
+                table = model._meta.db_table
+                column_sql = ', '.join(f'"{f.column}"' for f in model._meta.concrete_fields)
+                counts[model.__name__] = 0
+                for ids in batches(changed[table]):
+                    cursor.execute(
+                        f'INSERT INTO main."{table}" ({column_sql}) '
+                        f'SELECT {column_sql} FROM {ATTACH_SCHEMA}."{table}" '
+                        f'WHERE {curriculum_where(model, lookups[model], ATTACH_SCHEMA)} '
+                        f'AND "{model._meta.pk.column}" IN ({", ".join(["%s"] * len(ids))})',
+                        [curriculum_id, *ids],
+                    )
+                    counts[model.__name__] += cursor.rowcount
+
+            set_sync_cursor(target, curriculum_id, through)
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DETACH DATABASE {ATTACH_SCHEMA}')
+
+    return counts
+
+
+def batches(ids, size=BATCH_SIZE):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
@@ -0,0 +1,100 @@
+"""
+In-process cache of each curriculum's KSEC dictionary (code → item).
+
+Entries are keyed by (database file, curriculum id) — the read-only view
+alias shares the entries of 'default' — and tagged with
+Curriculum.ksec_version. Saving KSEC items calls bump_ksec_version(), which
+writes a new random version, so every process (and every database file
+swapped in by a sync) notices the change on its next lookup and reloads.
+"""
+
+import threading
+from collections import namedtuple
+
+from .models import Curriculum, KSECItem, new_ksec_version
+from .readonly import writable_alias
+
+
+KSECEntry = namedtuple('KSECEntry', 'id type category_type semester sort_order code description')
+
+
+class KSECDictionary:
+    """All KSEC items of one curriculum, indexed by code, id and type."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_id = {entry.id: entry for entry in entries}
+        self.by_code = {entry.code: entry for entry in entries}
+        self.code_ids = {entry.code: entry.id for entry in entries}
+        self.by_type = {typ: [] for typ in ('K', 'S', 'E', 'C')}
+        for entry in entries:
+            self.by_type.setdefault(entry.type, []).append(entry)
+
+    def describe(self, code):
+        entry = self.by_code.get(code)
+        return entry.description.strip() if entry else ''
+
+    def ordered(self, item_ids):
+        """Entries for `item_ids` in display order (sort_order, id)."""
+        entries = [self.by_id[i] for i in item_ids if i in self.by_id]
+        return sorted(entries, key=lambda entry: (entry.sort_order, entry.id))
+
+
+_entries = {}   # (writable alias, curriculum id) -> (version, KSECDictionary)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def load_dictionary(db, curriculum_id):
+    items = KSECItem.objects.using(db).filter(curriculum_id=curriculum_id).order_by('type', 'sort_order', 'id')
+    return KSECDictionary([
+        KSECEntry(item.id, item.type, item.category_type, item.semester, item.sort_order,
+                  item.code, item.description)
+        for item in items
+    ])
+
+
+def current_version(db, curriculum_id):
+    return Curriculum.objects.using(db).filter(id=curriculum_id).values_list('ksec_version', flat=True).first()
+
+
+def ksec_dictionary(db, curriculum_id, version=None):
+    """
+    KSECDictionary of one curriculum. Pass `version` (curriculum.ksec_version)
+    when the Curriculum row is already loaded to skip the version lookup.
+    """
+    if version is None:
+        version = current_version(db, curriculum_id)
+
+    key = (writable_alias(db), curriculum_id)
+    with _lock:
+        cached = _entries.get(key)
+        if cached and cached[0] == version:
+            _stats['hits'] += 1
+            return cached[1]
+        _stats['misses'] += 1
+
+    dictionary = load_dictionary(db, curriculum_id)
+    with _lock:
+        _entries[key] = (version, dictionary)
+    return dictionary
+
+
+def bump_ksec_version(db, curriculum_id):
+    """Mark the curriculum's KSEC items as changed (call inside the saving transaction)."""
+    Curriculum.objects.using(db).filter(id=curriculum_id).update(ksec_version=new_ksec_version())
+    with _lock:
+        _entries.pop((writable_alias(db), curriculum_id), None)
+
+
+def ksec_cache_stats():
+    with _lock:
+        hits, misses = _stats['hits'], _stats['misses']
+        size = len(_entries)
+    lookups = hits + misses
+    return {
+        'entries': size,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else None,
+    }
@@ -0,0 +1,54 @@
+"""
+Compare the two curriculum replication paths (ORM bulk_create vs SQLite
+ATTACH + INSERT ... SELECT) on a synthetic curriculum.
+
+    python manage.py bench_replication --courses-per-semester 1250 --clos-per-course 5
+
+The default scale is 50 000 CLOs. Both databases are temporary SQLite
+files; the configured databases are never touched.
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from table.replication import replicate_curriculum_orm, replicate_curriculum_sqlite
+from table.synthetic import generate_curriculum, temporary_sqlite_aliases
+
+
+class Command(BaseCommand):
+    help = "Benchmark ORM vs SQLite ATTACH curriculum replication."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses-per-semester', type=int, default=1250)
+        parser.add_argument('--clos-per-course', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        source, target = 'bench_source', 'bench_target'
+
+        with temporary_sqlite_aliases(source, target):
+            started = time.perf_counter()
+            curriculum = generate_curriculum(
+                source,
+                courses_per_semester=options['courses_per_semester'],
+                clos_per_course=options['clos_per_course'],
+            )
+            self.stderr.write(f"Generated curriculum in {time.perf_counter() - started:.1f}s")
+
+            results = {}
+            for label, replicate in [('orm', replicate_curriculum_orm), ('sqlite_attach', replicate_curriculum_sqlite)]:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    counts = replicate(curriculum.id, source, target)
+                    timings.append(time.perf_counter() - started)
+                results[label] = {
+                    'rows': counts,
+                    'seconds': [round(t, 3) for t in timings],
+                    'best_seconds': round(min(timings), 3),
+                }
+
+        results['speedup'] = round(results['orm']['best_seconds'] / results['sqlite_attach']['best_seconds'], 1)
+        self.stdout.write(json.dumps(results, indent=2))
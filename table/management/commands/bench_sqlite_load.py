@@ -0,0 +1,261 @@
+"""
+Mixed read/write load on the SQLite databases, run under three profiles:
+
+- stock: Django's stock SQLite settings (rollback journal, no PRAGMAs, a new
+  connection per request), view pages reading through 'default' and
+  sessions stored in real.sqlite3 — the original setup;
+- tuned, sessions in real: settings.DATABASES, but sessions still share
+  real.sqlite3 (and its write lock) with the curriculum data;
+- tuned: settings.DATABASES as configured (sessions in sessions.sqlite3).
+
+    python manage.py bench_sqlite_load --readers 6 --writers 2 --seconds 10
+
+Readers request view-mode pages (example DB), reselect the curriculum and
+save CLO drafts to their session; writers save course lists and CLO maps in
+edit mode (real DB, and both DBs for CLO maps). Runs on
+temporary copies holding one synthetic curriculum; reports throughput,
+p50/p95 latency, "database is locked" failures, saves refused by the
+write queue (503, table.write_queue) and the transactions that took
+real.sqlite3's write lock, with the time spent waiting for it, as JSON.
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+
+from table.journal import sync_curriculum
+from table.management.commands.bench_views import percentile
+from table.models import CLO, CreditRow, Course
+from table.readonly import VIEW_DB
+from table.snapshots import backup_into
+from table.synthetic import generate_curriculum, temporary_sqlite_aliases
+
+
+DATA_ALIASES = ('default', 'real')
+ALIASES = (*DATA_ALIASES, 'sessions')
+
+# profile → (Django's stock settings, sessions in real.sqlite3)
+PROFILES = {
+    'stock': (True, True),
+    'tuned, sessions in real': (False, True),
+    'tuned': (False, False),
+}
+
+# Django's defaults: no PRAGMAs, deferred transactions, a new connection per request
+STOCK = {
+    'CONN_MAX_AGE': 0,
+    'CONN_HEALTH_CHECKS': False,
+    'OPTIONS': {},
+}
+
+
+class Worker(threading.Thread):
+    """Sends requests until `deadline`, recording latencies, failures and real.sqlite3 lock waits."""
+
+    def __init__(self, mode, requests, deadline, seed, real_file):
+        super().__init__(daemon=True)
+        self.mode = mode
+        self.real_file = real_file
+        self.requests = requests        # list of (method, url, data or None)
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.timings = []
+        self.locked = 0
+        self.busy = 0
+        self.errors = 0
+        self.saw_lock = False
+        self.lock_waits = []            # ms per BEGIN on real.sqlite3 (IMMEDIATE waits for the write lock)
+
+    def watch(self, execute, sql, params, many, context):
+        """execute_wrapper: note lock errors and lock waits (connections are per thread, so is this)."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            if 'locked' in str(e):
+                self.saw_lock = True
+            raise
+        finally:
+            if sql.startswith('BEGIN') and str(context['connection'].settings_dict['NAME']) == self.real_file:
+                self.lock_waits.append((time.perf_counter() - started) * 1000)
+
+    def run(self):
+        # request exceptions reach every Client through a global signal: read status codes instead
+        client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+        try:
+            with ExitStack() as stack:
+                for alias in (*ALIASES, VIEW_DB):
+                    stack.enter_context(connections[alias].execute_wrapper(self.watch))
+                session = client.session
+                session['access_mode'] = self.mode
+                session.save()
+                while time.perf_counter() < self.deadline:
+                    method, url, data = self.rng.choice(self.requests)
+                    self.saw_lock = False
+                    started = time.perf_counter()
+                    response = client.post(url, data) if method == 'post' else client.get(url)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    if response.status_code == 503:
+                        self.busy += 1       # write queue back-pressure
+                    elif response.status_code >= 500:
+                        if self.saw_lock:
+                            self.locked += 1
+                        else:
+                            self.errors += 1
+                    else:
+                        self.timings.append(elapsed)
+        finally:
+            connections.close_all()
+
+
+def summarize(workers, seconds):
+    timings = [t for worker in workers for t in worker.timings]
+    lock_waits = [t for worker in workers for t in worker.lock_waits]
+    return {
+        'requests': len(timings),
+        'per_second': round(len(timings) / seconds, 1),
+        'p50_ms': round(percentile(timings, 50), 1) if timings else None,
+        'p95_ms': round(percentile(timings, 95), 1) if timings else None,
+        'locked': sum(worker.locked for worker in workers),
+        'busy': sum(worker.busy for worker in workers),
+        'errors': sum(worker.errors for worker in workers),
+        'real_transactions': len(lock_waits),
+        'real_lock_wait_ms': round(sum(lock_waits), 1),
+        'real_lock_wait_p95_ms': round(percentile(lock_waits, 95), 1) if lock_waits else None,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark stock vs tuned SQLite settings (and where sessions live) under mixed read/write load."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=6)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--courses-per-semester', type=int, default=20)
+
+    def handle(self, *args, **options):
+        request_log = logging.getLogger('table.requests')
+        request_log_level = request_log.level
+        request_log.setLevel(logging.ERROR)
+        try:
+            with temporary_sqlite_aliases(*ALIASES) as workdir:
+                report = self.run(workdir, options)
+        finally:
+            request_log.setLevel(request_log_level)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, workdir, options):
+        curriculum = generate_curriculum('real', courses_per_semester=options['courses_per_semester'])
+        sync_curriculum(curriculum.id, source='real', target='default')
+        requests = self.workload(curriculum.id)
+
+        tuned = {alias: dict(connections.settings[alias]) for alias in (*ALIASES, VIEW_DB)}
+        pristine = {}
+        for alias in DATA_ALIASES:
+            pristine[alias] = workdir / f'{alias}.pristine.sqlite3'
+            backup_into(connections.settings[alias]['NAME'], pristine[alias])
+
+        report = {}
+        for profile, (stock, shared_sessions) in PROFILES.items():
+            for alias in DATA_ALIASES:
+                connections[alias].close()
+                del connections[alias]
+                config = {**tuned[alias], **STOCK} if stock else tuned[alias]
+                connections.settings[alias] = config
+                # fresh copy of the data, in the profile's journal mode
+                backup_into(pristine[alias], config['NAME'], pages=-1)
+                with sqlite3.connect(config['NAME']) as db:
+                    db.execute(f"PRAGMA journal_mode = {'DELETE' if stock else 'WAL'}")
+                db.close()
+            for alias in (VIEW_DB, 'sessions'):
+                connections[alias].close()
+                del connections[alias]
+            connections.settings[VIEW_DB] = dict(connections.settings['default']) if stock else tuned[VIEW_DB]
+            connections.settings['sessions'] = (
+                dict(connections.settings['real']) if shared_sessions else tuned['sessions']
+            )
+            sessions = connections['sessions']
+            if Session._meta.db_table not in sessions.introspection.table_names():
+                # real.sqlite3 records the sessions migration as applied without having the table
+                with sessions.schema_editor() as editor:
+                    editor.create_model(Session)
+
+            deadline = time.perf_counter() + options['seconds']
+            real_file = str(connections.settings['real']['NAME'])
+            readers = [Worker('view', requests['read'], deadline, i, real_file) for i in range(options['readers'])]
+            writers = [Worker('edit', requests['write'], deadline, 100 + i, real_file)
+                       for i in range(options['writers'])]
+            for worker in readers + writers:
+                worker.start()
+            for worker in readers + writers:
+                worker.join()
+
+            with connections['real'].cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            report[profile] = {
+                'journal_mode': journal_mode,
+                'sessions': Path(connections.settings['sessions']['NAME']).name,
+                'reads': summarize(readers, options['seconds']),
+                'writes': summarize(writers, options['seconds']),
+            }
+            self.stderr.write(f"{profile}: {json.dumps(report[profile])}")
+
+        return {
+            'readers': options['readers'],
+            'writers': options['writers'],
+            'seconds': options['seconds'],
+            **report,
+        }
+
+    def workload(self, cid):
+        rows = CreditRow.objects.using('real').filter(curriculum_id=cid)
+        course_row = rows.filter(row_type__in=['general', 'core']).order_by('id').first()
+        courses = list(Course.objects.using('real').filter(curriculum_id=cid).order_by('id'))
+        sample = random.Random(0).sample(courses, min(len(courses), 10))
+
+        read = [('get', reverse('credit_table', args=[cid]), None),
+                ('get', reverse('plo_summary', args=[cid]), None)]
+        read += [('get', reverse('clo_ksec_map', args=[cid, course.id]), None) for course in sample]
+        # requests that write the session: mode switch, CLO drafts
+        read.append(('post', reverse('curriculum_select'), {'curriculum': cid, 'mode': 'view'}))
+        for course in sample[:3]:
+            clos = list(CLO.objects.using('real').filter(course=course).order_by('index'))
+            read.append(('post', reverse('save_clo_ksec_to_session', args=[cid, course.id]), {
+                'clo[]': [clo.clo for clo in clos], 'bloom[]': [clo.bloom for clo in clos],
+                'k[]': [clo.k for clo in clos], 's[]': [clo.s for clo in clos],
+                'e[]': [clo.e for clo in clos], 'c[]': [clo.c for clo in clos],
+                'course_description': 'Draft under load',
+            }))
+
+        write = []
+        for semester in (1, 2):
+            listed = [c for c in courses if c.credit_row_id == course_row.id and c.semester == semester]
+            if listed:
+                write.append(('post', reverse('save_course_list', args=[cid, course_row.id, semester]), {
+                    'course_code[]': [c.course_code for c in listed],
+                    'course_name[]': [f'{c.course_name} (edited)' for c in listed],
+                    'credits[]': [c.credits for c in listed],
+                    'plo[]': [c.plo for c in listed],
+                }))
+        for course in sample:
+            clos = list(CLO.objects.using('real').filter(course=course).order_by('index'))
+            write.append(('post', reverse('save_clo_ksec_map', args=[cid, course.id]), {
+                'clo[]': [clo.clo for clo in clos], 'bloom[]': [clo.bloom for clo in clos],
+                'k[]': [clo.k for clo in clos], 's[]': [clo.s for clo in clos],
+                'e[]': [clo.e for clo in clos], 'c[]': [clo.c for clo in clos],
+                'course_description': 'Edited under load',
+            }))
+        return {'read': read, 'write': write}
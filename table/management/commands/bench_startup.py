@@ -0,0 +1,91 @@
+"""
+Measure what a web worker pays at boot: import time and peak RSS of
+django.setup() plus loading every URL pattern (and so every view module).
+
+    python manage.py bench_startup --max-import-ms 800 --max-rss-mb 120
+
+Each sample is a fresh interpreter. The "with_charting" run also imports
+matplotlib/numpy, which is what every worker paid when views.py imported
+pyplot at module level. Exits with an error when a budget is exceeded or a
+heavy module is loaded at boot, so it can guard against regressions.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+HEAVY_MODULES = ['matplotlib', 'numpy']
+
+BOOT_SCRIPT = r'''
+import json, os, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+for name in sys.argv[1:]:
+    __import__(name)
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'import_ms': elapsed * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'loaded': [m for m in %r if m in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+def boot_sample(extra_imports=()):
+    result = subprocess.run(
+        [sys.executable, '-c', BOOT_SCRIPT, *extra_imports],
+        capture_output=True, text=True, check=True, env=os.environ.copy(),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    return {
+        'import_ms_p50': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'rss_mb_p50': round(statistics.median(s['rss_mb'] for s in samples), 1),
+        'heavy_modules_loaded': samples[0]['loaded'],
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark worker boot (import time and RSS) and check budgets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--max-import-ms', type=float, help="Fail if median boot import time exceeds this.")
+        parser.add_argument('--max-rss-mb', type=float, help="Fail if median peak RSS exceeds this.")
+        parser.add_argument('--no-compare', action='store_true', help="Skip the with_charting run.")
+
+    def handle(self, *args, **options):
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'PLO_curriculumDsgn1.settings')
+
+        results = {'worker_boot': summarize([boot_sample() for _ in range(options['repeat'])])}
+        if not options['no_compare']:
+            results['with_charting'] = summarize([
+                boot_sample(['numpy', 'matplotlib.figure']) for _ in range(options['repeat'])
+            ])
+            results['saved_import_ms'] = round(
+                results['with_charting']['import_ms_p50'] - results['worker_boot']['import_ms_p50'], 1)
+            results['saved_rss_mb'] = round(
+                results['with_charting']['rss_mb_p50'] - results['worker_boot']['rss_mb_p50'], 1)
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+        boot = results['worker_boot']
+        problems = []
+        if boot['heavy_modules_loaded']:
+            problems.append(f"loaded at boot: {', '.join(boot['heavy_modules_loaded'])}")
+        if options['max_import_ms'] is not None and boot['import_ms_p50'] > options['max_import_ms']:
+            problems.append(f"import {boot['import_ms_p50']}ms > {options['max_import_ms']}ms")
+        if options['max_rss_mb'] is not None and boot['rss_mb_p50'] > options['max_rss_mb']:
+            problems.append(f"RSS {boot['rss_mb_p50']}MB > {options['max_rss_mb']}MB")
+        if problems:
+            raise CommandError('Startup budget exceeded: ' + '; '.join(problems))
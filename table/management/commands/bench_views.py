@@ -0,0 +1,168 @@
+"""
+Time the main views on a synthetic curriculum and report query counts and
+p50/p95 latencies as JSON, for comparison across commits.
+
+    python manage.py bench_views --courses-per-semester 40 --clos-per-course 6 --output bench.json
+
+While it runs, 'default', 'real' and 'sessions' point at temporary,
+migrated SQLite files holding one generated curriculum (table.synthetic),
+and the read-only view alias reads the temporary 'default'; the configured
+database files are never touched. Requests go through the full middleware
+stack with django.test.Client.
+"""
+
+import json
+import logging
+import math
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from table.chart_cache import chart_cache
+from table.journal import sync_curriculum
+from table.models import CreditRow, Course, SyncCursor
+from table.readonly import VIEW_DB
+from table.replication import CURRICULUM_GRAPH, curriculum_rows
+from table.synthetic import generate_curriculum, temporary_sqlite_aliases
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def current_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = "Benchmark the main views on a synthetic curriculum (JSON report)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plos', type=int, default=13)
+        parser.add_argument('--courses-per-semester', type=int, default=40)
+        parser.add_argument('--clos-per-course', type=int, default=6)
+        parser.add_argument('--ksec-per-type', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        request_log = logging.getLogger('table.requests')
+        request_log_level = request_log.level
+        request_log.setLevel(logging.ERROR)   # one JSON line per request would drown the report
+        try:
+            with temporary_sqlite_aliases('default', 'real', 'sessions'):
+                report = self.run(options)
+        finally:
+            request_log.setLevel(request_log_level)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    def run(self, options):
+        started = time.perf_counter()
+        curriculum = generate_curriculum(
+            'real',
+            plos=options['plos'],
+            courses_per_semester=options['courses_per_semester'],
+            clos_per_course=options['clos_per_course'],
+            ksec_per_type=options['ksec_per_type'],
+        )
+        cid = curriculum.id
+        sync_curriculum(cid, source='real', target='default')
+        self.stderr.write(f"Generated curriculum in {time.perf_counter() - started:.1f}s")
+
+        plo_row = CreditRow.objects.using('real').filter(curriculum_id=cid, row_type='plo').order_by('id').first()
+        course = Course.objects.using('real').filter(curriculum_id=cid).order_by('id').first()
+
+        def rename_course(i):
+            # one changed row for the incremental backup to replay
+            Course.objects.using('real').filter(id=course.id).update(course_name=f'Benchmark course {i}')
+
+        def forget_cursor(i):
+            SyncCursor.objects.using('default').filter(curriculum_id=cid).delete()
+
+        def clear_charts(i):
+            chart_cache.clear()
+
+        pages = [
+            ('credit_table', reverse('credit_table', args=[cid])),
+            ('plo_summary', reverse('plo_summary', args=[cid])),
+            ('clo_ksec_map', reverse('clo_ksec_map', args=[cid, course.id])),
+            ('plo_course_list', reverse('plo_course_list', args=[cid, plo_row.id, 1])),
+        ]
+        cases = [
+            (f'{name} ({mode})', mode, 'get', url, None)
+            for mode in ('view', 'edit') for name, url in pages
+        ] + [
+            ('plo_graph (render)', 'view', 'get', reverse('plo_graph_from_creditrow', args=[cid]), clear_charts),
+            ('plo_graph (cached)', 'view', 'get', reverse('plo_graph_from_creditrow', args=[cid]), None),
+            ('backup (incremental)', 'edit', 'post',
+             reverse('sync_curriculum_real_to_example', args=[cid]), rename_course),
+            ('backup (full)', 'edit', 'post', reverse('sync_curriculum_real_to_example', args=[cid]), forget_cursor),
+            ('restore', 'edit', 'post', reverse('sync_curriculum_example_to_real', args=[cid]), None),
+        ]
+
+        client = Client(HTTP_HOST='localhost')
+        results = {}
+        for name, mode, method, url, before in cases:
+            session = client.session
+            session['access_mode'] = mode
+            session.save()
+
+            timings, statuses, queries = [], set(), {}
+            for i in range(options['repeat'] + 1):   # the first run only warms caches
+                if before:
+                    before(i)
+                with CaptureQueriesContext(connections['real']) as real_q, \
+                        CaptureQueriesContext(connections['default']) as default_q, \
+                        CaptureQueriesContext(connections[VIEW_DB]) as view_q:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url)
+                    elapsed = (time.perf_counter() - started) * 1000
+                statuses.add(response.status_code)
+                if i:
+                    timings.append(elapsed)
+                queries = {'real': len(real_q), 'default': len(default_q), VIEW_DB: len(view_q)}
+
+            results[name] = {
+                'status': sorted(statuses),
+                'queries': queries,
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'max_ms': round(max(timings), 2),
+            }
+            self.stderr.write(f"{name:28s} p50 {results[name]['p50_ms']:8.2f} ms  queries {queries}")
+
+        return {
+            'commit': current_commit(),
+            'repeat': options['repeat'],
+            'scale': {
+                'plos': options['plos'],
+                'courses_per_semester': options['courses_per_semester'],
+                'clos_per_course': options['clos_per_course'],
+                'ksec_per_type': options['ksec_per_type'],
+                'rows': {
+                    model.__name__: curriculum_rows(model, lookup, cid, 'real').count()
+                    for model, lookup in CURRICULUM_GRAPH
+                },
+            },
+            'results': results,
+        }
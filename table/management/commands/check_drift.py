@@ -0,0 +1,41 @@
+"""
+Report which curricula differ between the real and example databases,
+using the SyncDigest trees kept by table.drift.
+
+    python manage.py check_drift            # report only
+    python manage.py check_drift --fix      # re-copy the drifted buckets real → example
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from table.drift import find_drift, resync_buckets
+from table.models import Curriculum
+
+
+class Command(BaseCommand):
+    help = "Compare curriculum digests between the real and example databases."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default='real')
+        parser.add_argument('--target', default='default')
+        parser.add_argument('--curriculum', type=int, action='append', help="Only these curriculum ids.")
+        parser.add_argument('--fix', action='store_true', help="Re-copy drifted buckets from source to target.")
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+        curriculum_ids = options['curriculum'] or list(
+            Curriculum.objects.using(source).order_by('id').values_list('id', flat=True)
+        )
+
+        report = {}
+        for curriculum_id in curriculum_ids:
+            drift = find_drift(curriculum_id, source, target)
+            entry = {'drifted_buckets': [f'{table}:{bucket}' for table, bucket in drift]}
+            if drift and options['fix']:
+                entry['rows_copied'] = resync_buckets(curriculum_id, source, target, drift)
+                entry['in_sync_after_fix'] = not find_drift(curriculum_id, source, target)
+            report[curriculum_id] = entry
+
+        self.stdout.write(json.dumps(report, indent=2))
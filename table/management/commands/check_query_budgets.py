@@ -0,0 +1,274 @@
+"""
+Query-budget check for every URL in table/urls.py.
+
+    python manage.py check_query_budgets            # fail on any view over budget
+    python manage.py check_query_budgets --verbose  # also print the SQL of every case
+
+Loads the fixture curriculum of table.query_budgets.FIXTURE into temporary
+copies of 'real' and 'default' (with a temporary 'sessions'), requests every
+URL in view and edit mode (and submits the write forms; view mode reads the
+read-only mirror of 'default'), and compares each request's query count
+against QUERY_BUDGETS. Cases over budget (or failing with a server error)
+print their repeated statements. The SIZE_INDEPENDENT views are then
+requested for two fresh curricula, FIXTURE and SCALED_FIXTURE, and fail
+when the larger one takes more (or fewer) queries.
+Session and login lookups are not counted. GETs are counted on their
+second request, once per-process caches and lazily built summaries are warm.
+"""
+
+import logging
+import re
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from table import urls as table_urls
+from table.journal import sync_curriculum
+from table.models import CLO, CreditRow, Course, KSECItem
+from table.query_budgets import FIXTURE, QUERY_BUDGETS, SCALED_FIXTURE, SIZE_INDEPENDENT
+from table.readonly import VIEW_DB
+from table.synthetic import generate_curriculum, temporary_sqlite_aliases
+
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+# Session and login lookups happen on every request and are not the view's own SQL
+FRAMEWORK_TABLES = ('"django_session"', '"auth_user"')
+
+
+def normalize_sql(sql):
+    """Replace literals so the same statement with other parameters compares equal."""
+    return LITERAL_RE.sub('?', sql)
+
+
+def repeated_statements(queries):
+    counts = Counter(normalize_sql(query['sql']) for query in queries)
+    return [(count, sql) for sql, count in counts.most_common() if count > 1]
+
+
+class Fixture:
+    """The generated curriculum and the ids its URLs need."""
+
+    def __init__(self, curriculum):
+        self.curriculum = curriculum
+        self.cid = curriculum.id
+        rows = CreditRow.objects.using('real').filter(curriculum_id=self.cid).order_by('id')
+        self.rows = list(rows)
+        self.course_row = rows.filter(row_type__in=['general', 'core']).first()
+        self.plo_row = rows.filter(row_type='plo').first()
+        self.course = Course.objects.using('real').filter(curriculum_id=self.cid).order_by('id').first()
+        self.semester = self.course.semester
+
+    def url_kwargs(self, name, params):
+        values = {
+            'curriculum_id': self.cid,
+            'row_id': self.plo_row.id if name.startswith(('plo_course', 'save_plo_course')) else self.course_row.id,
+            'semester': self.semester,
+            'type': 'K',
+            'course_id': self.course.id,
+            'db_name': 'example',
+        }
+        return {param: values[param] for param in params}
+
+    def query_string(self, name):
+        return f'?semester={self.semester}&type=K' if name == 'ksec_item_select' else ''
+
+    # ---------- Form payloads (resubmit what the page shows) ----------
+    def credit_table_form(self):
+        data = {'curriculum_name': self.curriculum.name}
+        for index, row in enumerate(r for r in self.rows if r.row_type in ('general', 'core', 'plo')):
+            data[f'{row.row_type}_id_{index}'] = row.id
+            data[f'{row.row_type}_name_{index}'] = row.name
+            for j in range(8):
+                data[f'{row.row_type}_credit_{index}_{j}'] = getattr(row, f'credits_sem{j + 1}')
+        return data
+
+    def course_list_form(self):
+        courses = Course.objects.using('real').filter(
+            credit_row=self.course_row, semester=self.semester
+        ).order_by('course_code')
+        return {
+            'course_code[]': [c.course_code for c in courses],
+            'course_name[]': [c.course_name for c in courses],
+            'credits[]': [c.credits for c in courses],
+            'plo[]': [c.plo for c in courses],
+        }
+
+    def ylo_form(self):
+        courses = Course.objects.using('real').filter(curriculum_id=self.cid, semester=self.semester)
+        return {f'{key}_{c.id}': getattr(c, field) for c in courses
+                for key, field in [('k', 'knowledge'), ('s', 'skills'), ('e', 'ethics'), ('c', 'character')]}
+
+    def ksec_form(self):
+        items = KSECItem.objects.using('real').filter(curriculum_id=self.cid, type='K').order_by('sort_order', 'id')
+        data = {'total_items': len(items)}
+        for i, item in enumerate(items):
+            data.update({f'item_id_{i}': item.id, f'item_{i}': item.description, f'item_type_{i}': item.category_type})
+        return data
+
+    def clo_form(self):
+        clos = CLO.objects.using('real').filter(course=self.course).order_by('index')
+        return {
+            'clo[]': [clo.clo for clo in clos],
+            'bloom[]': [clo.bloom for clo in clos],
+            'k[]': [clo.k for clo in clos], 's[]': [clo.s for clo in clos],
+            'e[]': [clo.e for clo in clos], 'c[]': [clo.c for clo in clos],
+            'course_description': 'Benchmark description',
+            'session_password': self.curriculum.clo_edit_password,
+        }
+
+    def post_forms(self):
+        """URL name → form data, in the order they are submitted (destructive resets last)."""
+        return {
+            'curriculum_select': lambda: {'curriculum': self.cid, 'mode': 'edit', 'password': self.curriculum.password},
+            'save_clo_ksec_to_session': self.clo_form,
+            'save_clo_ksec_map': self.clo_form,
+            'save_course_list': self.course_list_form,
+            'save_plo_course_list': lambda: {'summary_text': 'Benchmark YLO'},
+            'save_ylo_studyplan': self.ylo_form,
+            'ksec_edit': self.ksec_form,
+            'credit_table': self.credit_table_form,
+            'sync_curriculum_real_to_example': dict,
+            'sync_curriculum_example_to_real': dict,
+            'sync_real_to_example': dict,
+            'reset_clo_ksec_map': self.clo_form,
+            'reset_course_list': dict,
+            'reset_credit_table': dict,
+        }
+
+
+class Command(BaseCommand):
+    help = "Check every view's SQL query count against table.query_budgets."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help="Print the SQL of every case.")
+
+    def handle(self, *args, **options):
+        request_log = logging.getLogger('table.requests')
+        request_log_level = request_log.level
+        request_log.setLevel(logging.ERROR)
+        try:
+            with temporary_sqlite_aliases('default', 'real', 'sessions'):
+                results = self.run(options['verbose'])
+        finally:
+            request_log.setLevel(request_log_level)
+
+        failures = [r for r in results if r['over']]
+        width = max(len(r['case']) for r in results)
+        for r in results:
+            mark = '❌' if r['over'] else '✅'
+            self.stdout.write(f"{mark} {r['case']:{width}s} {r['queries']:4d} / {r['budget']}  (HTTP {r['status']})")
+            if r['over'] or options['verbose']:
+                for count, sql in r['repeated']:
+                    self.stdout.write(f"      {count:3d}× {sql}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} case(s) over their query budget.")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(results)} cases within budget."))
+
+    def run(self, verbose):
+        curriculum = generate_curriculum('real', **FIXTURE)
+        sync_curriculum(curriculum.id, source='real', target='default')
+        fixture = Fixture(curriculum)
+
+        user = get_user_model().objects.db_manager('real').create_superuser('budget', password='budget')
+        client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+        client.force_login(user)
+
+        patterns = {p.name: p for p in table_urls.urlpatterns}
+        missing = sorted(set(patterns) - set(QUERY_BUDGETS))
+        if missing:
+            raise CommandError(f"No query budget declared for: {', '.join(missing)}")
+
+        def url_of(name):
+            params = patterns[name].pattern.converters.keys()
+            return reverse(name, kwargs=fixture.url_kwargs(name, params)) + fixture.query_string(name)
+
+        cases = [
+            (name, mode, 'get', None)
+            for mode in ('view', 'edit')
+            for name, budgets in QUERY_BUDGETS.items() if mode in budgets
+        ]
+        forms = fixture.post_forms()
+        cases += [
+            (name, mode, 'post', forms[name])
+            for name in forms
+            for mode in ('view', 'edit') if f'{mode} POST' in QUERY_BUDGETS[name]
+        ]
+
+        results = []
+        for name, mode, method, form in cases:
+            url = url_of(name)
+            data = form() if form else None
+            for attempt in range(1 if method == 'post' else 2):   # GETs: count the warm request
+                queries, response = request_queries(client, mode, method, url, data)
+            case = f"{name} [{mode}{' POST' if method == 'post' else ''}]"
+            budget = QUERY_BUDGETS[name][f"{mode}{' POST' if method == 'post' else ''}"]
+            results.append({
+                'case': case,
+                'queries': len(queries),
+                'budget': budget,
+                'status': response.status_code,
+                'over': len(queries) > budget or response.status_code >= 500,
+                'repeated': repeated_statements(queries) if verbose or len(queries) > budget else [],
+            })
+        return results + self.run_scaled(client, patterns, verbose)
+
+    def run_scaled(self, client, patterns, verbose):
+        """SIZE_INDEPENDENT views: same query counts (cold and warm) at FIXTURE and SCALED_FIXTURE size."""
+        fixtures = []
+        for options in (FIXTURE, SCALED_FIXTURE):
+            curriculum = generate_curriculum('real', **options)
+            sync_curriculum(curriculum.id, source='real', target='default')
+            fixtures.append(Fixture(curriculum))
+
+        results = []
+        for name in SIZE_INDEPENDENT:
+            params = patterns[name].pattern.converters.keys()
+            for mode in ('view', 'edit'):
+                if mode not in QUERY_BUDGETS[name]:
+                    continue
+                counts = []
+                for fixture in fixtures:
+                    url = reverse(name, kwargs=fixture.url_kwargs(name, params)) + fixture.query_string(name)
+                    for attempt in ('cold', 'warm'):
+                        queries, response = request_queries(client, mode, 'get', url)
+                        counts.append((len(queries), queries, response.status_code))
+                for i, attempt in enumerate(('cold', 'warm')):
+                    (small, _, _), (large, queries, status) = counts[i], counts[i + 2]
+                    over = large != small or status >= 500
+                    results.append({
+                        'case': f"{name} [{mode}, {attempt}] {SCALED_FIXTURE['courses_per_semester']} vs "
+                                f"{FIXTURE['courses_per_semester']} courses/semester",
+                        'queries': large,
+                        'budget': small,
+                        'status': status,
+                        'over': over,
+                        'repeated': repeated_statements(queries) if verbose or over else [],
+                    })
+        return results
+
+
+def request_queries(client, mode, method, url, data=None):
+    """The view's own queries (all aliases) and the response of one request in `mode`."""
+    session = client.session
+    session['access_mode'] = mode
+    session.save()
+
+    with CaptureQueriesContext(connections['real']) as real_q, \
+            CaptureQueriesContext(connections['default']) as default_q, \
+            CaptureQueriesContext(connections[VIEW_DB]) as view_q:
+        response = client.post(url, data) if method == 'post' else client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+
+    queries = [
+        query for query in real_q.captured_queries + default_q.captured_queries + view_q.captured_queries
+        if not any(table in query['sql'] for table in FRAMEWORK_TABLES)
+    ]
+    return queries, response
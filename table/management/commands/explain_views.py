@@ -0,0 +1,116 @@
+"""
+Run every read view of the 'table' app against the configured databases and
+write an EXPLAIN QUERY PLAN report for the SQL each view issues (view mode
+reads the read-only example connection, edit mode 'real').
+
+    python manage.py explain_views --output docs/query_plans.md
+"""
+
+import re
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from table.models import Curriculum, CreditRow, Course
+from table.readonly import VIEW_DB
+
+
+INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+
+def sample_urls(db):
+    """(label, url) for each GET view, using the first curriculum found in `db`."""
+    curriculum = Curriculum.objects.using(db).order_by('id').first()
+    if curriculum is None:
+        return []
+
+    cid = curriculum.id
+    rows = CreditRow.objects.using(db).filter(curriculum=curriculum).order_by('id')
+    plo_row = rows.filter(row_type='plo').first()
+    general_row = rows.filter(row_type__in=['general', 'core']).first()
+    course = Course.objects.using(db).filter(curriculum=curriculum).order_by('id').first()
+
+    urls = [
+        ('credit_table', reverse('credit_table', args=[cid])),
+        ('course_list (free electives)', reverse('course_list', args=[cid, 'free_elective', 1])),
+        ('ylo_study_plan', reverse('ylo_study_plan', args=[cid, 1])),
+        ('ksec_edit', reverse('ksec_edit', args=[cid, 1, 'K'])),
+        ('ksec_item_select', reverse('ksec_item_select', args=[cid]) + '?semester=1&type=K'),
+        ('plo_summary', reverse('plo_summary', args=[cid])),
+        ('plo_graph_from_creditrow', reverse('plo_graph_from_creditrow', args=[cid])),
+    ]
+    if general_row:
+        urls.append(('course_list', reverse('course_list', args=[cid, general_row.id, 1])))
+    if plo_row:
+        urls.append(('plo_course_list', reverse('plo_course_list', args=[cid, plo_row.id, 1])))
+    if course:
+        urls.append(('clo_ksec_map', reverse('clo_ksec_map', args=[cid, course.id])))
+    return urls
+
+
+def run_view(url, mode):
+    """Call the view behind `url` directly (no middleware) with an unsaved session."""
+    request = RequestFactory().get(url)
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    request.session['access_mode'] = mode
+    match = resolve(request.path_info)
+    return match.func(request, *match.args, **match.kwargs)
+
+
+def explain(db, sql):
+    with connections[db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class Command(BaseCommand):
+    help = "Write an EXPLAIN QUERY PLAN report for the SQL issued by each view."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Markdown file to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        lines = ['# Query plans per view', '',
+                 'Generated by `python manage.py explain_views`.', '']
+        summary = []
+        details = []
+
+        for mode, db in [('view', VIEW_DB), ('edit', 'real')]:
+            for label, url in sample_urls(db):
+                with CaptureQueriesContext(connections[db]) as queries:
+                    run_view(url, mode)
+
+                seen = set()
+                used = []
+                details += [f'## {label} — {mode} mode (`{db}`)', '', f'`GET {url}`', '']
+                for query in queries.captured_queries:
+                    sql = query['sql']
+                    if not sql.startswith('SELECT') or sql in seen:
+                        continue
+                    seen.add(sql)
+
+                    plan = explain(db, sql)
+                    used += [name for step in plan for name in INDEX_RE.findall(step)]
+                    details += ['```sql', sql, '```', '', '```text', *plan, '```', '']
+
+                summary.append(
+                    f"| {label} | {mode} | {len(queries)} | "
+                    f"{', '.join(sorted(set(used))) or '—'} |"
+                )
+
+        lines += ['| View | Mode | Queries | Indexes used |',
+                  '|------|------|---------|--------------|',
+                  *summary, '', *details]
+        report = '\n'.join(lines)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(report)
+            self.stdout.write(self.style.SUCCESS(f"✅ Wrote {options['output']}"))
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,70 @@
+"""
+Add synthetic curricula (table.synthetic) to the configured databases.
+
+    python manage.py generate_curricula --count 3 --courses-per-semester 40 --clos-per-course 6
+
+With --database both (the default) each curriculum is generated in 'real'
+and backed up to 'default' the way the app does it, so both copies share
+ids and the example database's sync cursor is set. Its rows get ids unused
+in either database, so the backup never overwrites another curriculum.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from django.db.models import Max
+
+from table.journal import sync_curriculum
+from table.models import Curriculum
+from table.synthetic import generate_curriculum
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic curricula at a configurable scale."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', choices=['both', 'real', 'default'], default='both')
+        parser.add_argument('--count', type=int, default=1)
+        parser.add_argument('--plos', type=int, default=13)
+        parser.add_argument('--courses-per-semester', type=int, default=8)
+        parser.add_argument('--clos-per-course', type=int, default=5)
+        parser.add_argument('--ksec-per-type', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--name', default='Synthetic curriculum')
+
+    def handle(self, *args, **options):
+        both = options['database'] == 'both'
+        target = 'real' if both else options['database']
+        aliases = ['real', 'default'] if both else [target]
+
+        for n in range(options['count']):
+            # ids unused in every alias, so the backup never overwrites another curriculum
+            next_id = 1 + max(
+                Curriculum.objects.using(alias).aggregate(last=Max('id'))['last'] or 0 for alias in aliases
+            )
+            started = time.perf_counter()
+            curriculum = generate_curriculum(
+                target,
+                name=f"{options['name']} {next_id}",
+                plos=options['plos'],
+                courses_per_semester=options['courses_per_semester'],
+                clos_per_course=options['clos_per_course'],
+                ksec_per_type=options['ksec_per_type'],
+                seed=options['seed'] + n,
+                curriculum_id=next_id,
+                fresh_ids_in=aliases if both else (),
+            )
+            if both:
+                try:
+                    sync_curriculum(curriculum.id, source='real', target='default')
+                except DatabaseError as e:
+                    raise CommandError(
+                        f"Curriculum {curriculum.id} was created in 'real' but could not be copied "
+                        f"to 'default' ({e}). Run a full real → example sync first."
+                    )
+
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Curriculum {curriculum.id} in {' + '.join(aliases)} "
+                f"({time.perf_counter() - started:.1f}s)"
+            ))
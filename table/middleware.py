@@ -0,0 +1,141 @@
+"""
+Per-request performance metrics.
+
+RequestMetricsMiddleware times each request, counts its SQL queries and SQL
+time per database alias, and logs one JSON line per request to the
+'table.requests' logger, with the write-queue wait of saves
+(table.write_queue). Requests over the REQUEST_METRICS thresholds are
+logged at WARNING level together with their slowest SQL statements.
+"""
+
+import heapq
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('table.requests')
+
+DEFAULT_METRICS = {
+    'SLOW_REQUEST_MS': 500,    # wall time above which a request is slow
+    'SLOW_QUERY_COUNT': 50,    # ... or this many queries
+    'SLOW_SQL_MS': 200,        # ... or this much SQL time (all aliases)
+    'MAX_LOGGED_SQL': 50,      # slowest statements kept for the slow-request log
+}
+
+
+def metrics_settings():
+    return {**DEFAULT_METRICS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+class SlowestStatements:
+    """The `limit` slowest statements of a request (all aliases), and how many ran."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.total = 0
+        self.heap = []     # (seconds, position, alias, sql), fastest on top
+
+    def add(self, alias, sql, seconds):
+        self.total += 1
+        entry = (seconds, self.total, alias, sql)
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, entry)
+        elif self.heap and entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def slowest(self):
+        """[(position, alias, sql, seconds)], slowest first; position is 1-based execution order."""
+        return [(position, alias, sql, seconds)
+                for seconds, position, alias, sql in sorted(self.heap, reverse=True)]
+
+
+class QueryRecorder:
+    """connection.execute_wrapper callable: counts and times queries of one alias."""
+
+    def __init__(self, alias, statements):
+        self.alias = alias
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = statements         # SlowestStatements shared across aliases
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.statements.add(self.alias, sql, elapsed)
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = metrics_settings()
+
+    def __call__(self, request):
+        statements = SlowestStatements(self.options['MAX_LOGGED_SQL'])
+        recorders = [QueryRecorder(alias, statements) for alias in settings.DATABASES]
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for recorder in recorders:
+                stack.enter_context(connections[recorder.alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.log(request, response, elapsed_ms, recorders, statements)
+        return response
+
+    def log(self, request, response, elapsed_ms, recorders, statements):
+        match = request.resolver_match
+        queries = sum(r.count for r in recorders)
+        sql_ms = sum(r.seconds for r in recorders) * 1000
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'ms': round(elapsed_ms, 1),
+            'queries': queries,
+            'sql_ms': round(sql_ms, 1),
+            'db': {
+                r.alias: {'queries': r.count, 'sql_ms': round(r.seconds * 1000, 1)}
+                for r in recorders if r.count
+            },
+            'bytes': response_size(response),
+        }
+        write_queue = getattr(request, 'write_queue', None)
+        if write_queue:
+            record['write_queue'] = write_queue
+
+        slow = (
+            elapsed_ms >= self.options['SLOW_REQUEST_MS']
+            or queries >= self.options['SLOW_QUERY_COUNT']
+            or sql_ms >= self.options['SLOW_SQL_MS']
+        )
+        if slow:
+            record['slow'] = True
+            slowest = statements.slowest()
+            record['sql_logged'] = len(slowest)      # the slowest, of sql_total
+            record['sql_total'] = statements.total
+            record['sql'] = [
+                {'n': position, 'db': alias, 'ms': round(seconds * 1000, 2), 'sql': sql}
+                for position, alias, sql, seconds in slowest
+            ]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
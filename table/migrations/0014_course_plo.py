@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 15:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0013_creditrow_sort_order_alter_course_semester_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePLO',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plo', models.CharField(max_length=10)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plo_links', to='table.course')),
+                ('curriculum', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='table.curriculum')),
+            ],
+            options={
+                'db_table': 'table_course_plo',
+                'indexes': [models.Index(fields=['curriculum', 'plo'], name='course_plo_curr_plo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('course', 'plo'), name='unique_course_plo')],
+            },
+        ),
+    ]
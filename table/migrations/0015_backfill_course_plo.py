@@ -0,0 +1,53 @@
+import re
+
+from django.db import migrations
+
+
+PLO_TAG_RE = re.compile(r'PLO\s*(\d+)', re.IGNORECASE)
+
+
+def parse_plo_tags(text):
+    # Frozen copy of table.models.parse_plo_tags
+    tags = []
+    for number in PLO_TAG_RE.findall(text or ''):
+        tag = f"PLO{int(number)}"
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def backfill_course_plo(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Course = apps.get_model('table', 'Course')
+    CoursePLO = apps.get_model('table', 'CoursePLO')
+    YLOPerPLOSemester = apps.get_model('table', 'YLOPerPLOSemester')
+
+    links = [
+        CoursePLO(curriculum_id=curriculum_id, course_id=course_id, plo=tag)
+        for course_id, curriculum_id, plo in Course.objects.using(db).values_list('id', 'curriculum_id', 'plo')
+        for tag in parse_plo_tags(plo)
+    ]
+    CoursePLO.objects.using(db).bulk_create(links, batch_size=500)
+
+    # YLO summaries are keyed by the same normalized tag ("PLO1:" -> "PLO1")
+    for ylo in YLOPerPLOSemester.objects.using(db).all():
+        tags = parse_plo_tags(ylo.plo)
+        if tags and tags[0] != ylo.plo:
+            ylo.plo = tags[0]
+            ylo.save(update_fields=['plo'])
+
+
+def clear_course_plo(apps, schema_editor):
+    db = schema_editor.connection.alias
+    apps.get_model('table', 'CoursePLO').objects.using(db).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0014_course_plo'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_course_plo, clear_course_plo),
+    ]
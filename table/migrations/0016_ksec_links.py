@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0015_backfill_course_plo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CLOKSEC',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ksec_links', to='table.clo')),
+                ('ksec_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='clo_links', to='table.ksecitem')),
+            ],
+            options={
+                'db_table': 'table_clo_ksec',
+                'indexes': [models.Index(fields=['ksec_item', 'clo'], name='clo_ksec_item_idx')],
+                'constraints': [models.UniqueConstraint(fields=('clo', 'ksec_item'), name='unique_clo_ksec')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseKSEC',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ksec_links', to='table.course')),
+                ('ksec_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_links', to='table.ksecitem')),
+            ],
+            options={
+                'db_table': 'table_course_ksec',
+                'indexes': [models.Index(fields=['ksec_item', 'course'], name='course_ksec_item_idx')],
+                'constraints': [models.UniqueConstraint(fields=('course', 'ksec_item'), name='unique_course_ksec')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations
+
+
+COURSE_KSEC_FIELDS = ('knowledge', 'skills', 'ethics', 'character')
+CLO_KSEC_FIELDS = ('k', 's', 'e', 'c')
+
+
+def parse_ksec_codes(text):
+    # Frozen copy of table.models.parse_ksec_codes
+    codes = []
+    for item in (text or '').split(','):
+        code = item.strip().replace(" ", "")
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+
+def backfill_ksec_links(apps, schema_editor):
+    db = schema_editor.connection.alias
+    KSECItem = apps.get_model('table', 'KSECItem')
+    Course = apps.get_model('table', 'Course')
+    CLO = apps.get_model('table', 'CLO')
+    CourseKSEC = apps.get_model('table', 'CourseKSEC')
+    CLOKSEC = apps.get_model('table', 'CLOKSEC')
+
+    # {(curriculum_id, code): item id}, code like "GE(K)1" (sort_order is 0-based)
+    code_map = {
+        (item.curriculum_id, f"{item.category_type}({item.type}){item.sort_order + 1}".replace(" ", "")): item.id
+        for item in KSECItem.objects.using(db).all()
+    }
+
+    course_links = []
+    for course_id, curriculum_id, *texts in Course.objects.using(db).values_list(
+        'id', 'curriculum_id', *COURSE_KSEC_FIELDS
+    ):
+        for code in parse_ksec_codes(','.join(text or '' for text in texts)):
+            item_id = code_map.get((curriculum_id, code))
+            if item_id:
+                course_links.append(CourseKSEC(course_id=course_id, ksec_item_id=item_id))
+    CourseKSEC.objects.using(db).bulk_create(course_links, batch_size=500)
+
+    clo_links = []
+    for clo_id, curriculum_id, *texts in CLO.objects.using(db).values_list(
+        'id', 'course__curriculum_id', *CLO_KSEC_FIELDS
+    ):
+        for code in parse_ksec_codes(','.join(text or '' for text in texts)):
+            item_id = code_map.get((curriculum_id, code))
+            if item_id:
+                clo_links.append(CLOKSEC(clo_id=clo_id, ksec_item_id=item_id))
+    CLOKSEC.objects.using(db).bulk_create(clo_links, batch_size=500)
+
+
+def clear_ksec_links(apps, schema_editor):
+    db = schema_editor.connection.alias
+    apps.get_model('table', 'CLOKSEC').objects.using(db).all().delete()
+    apps.get_model('table', 'CourseKSEC').objects.using(db).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0016_ksec_links'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ksec_links, clear_ksec_links),
+    ]
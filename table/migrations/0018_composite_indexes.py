@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 15:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0017_backfill_ksec_links'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['curriculum', 'semester', 'plo'], name='course_curr_sem_plo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['curriculum', 'credit_row', 'semester'], name='course_curr_row_sem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['curriculum', 'category', 'semester'], name='course_curr_cat_sem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ksecitem',
+            index=models.Index(fields=['curriculum', 'type', 'semester', 'sort_order'], name='ksec_curr_type_sem_ord_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='yloperplosemester',
+            index=models.Index(fields=['curriculum', 'plo', 'semester'], name='ylo_curr_plo_sem_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0018_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PLOSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plo', models.CharField(blank=True, max_length=10)),
+                ('label', models.CharField(max_length=200)),
+                ('description', models.CharField(max_length=200)),
+                ('course_count', models.IntegerField(default=0)),
+                ('total_credits', models.IntegerField(default=0)),
+                ('max_bloom', models.IntegerField(blank=True, null=True)),
+                ('courses', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('credit_row', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='plo_summary', to='table.creditrow')),
+                ('curriculum', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plo_summaries', to='table.curriculum')),
+            ],
+            options={
+                'db_table': 'table_plo_summary',
+                'indexes': [models.Index(fields=['curriculum', 'credit_row'], name='plo_summary_curr_row_idx'), models.Index(fields=['curriculum', 'plo'], name='plo_summary_curr_plo_idx')],
+            },
+        ),
+    ]
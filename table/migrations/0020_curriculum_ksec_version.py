@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 15:43
+
+import table.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0019_plo_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curriculum',
+            name='ksec_version',
+            field=models.CharField(default=table.models.new_ksec_version, editable=False, max_length=32),
+        ),
+    ]
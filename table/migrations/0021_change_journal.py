@@ -0,0 +1,93 @@
+# Generated by Django 5.2 on 2026-10-18 15:46
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+# Frozen copy of table.journal's triggers as of this migration: the journaled
+# databases, and per table its primary key and the SQL giving a row's curriculum.
+JOURNAL_DATABASES = ['real']
+
+JOURNAL_TABLE = 'table_change_journal'
+
+JOURNALED_TABLES = [
+    ('table_curriculum', 'id', '{row}."id"'),
+    ('table_creditrow', 'id', '{row}."curriculum_id"'),
+    ('table_course', 'id', '{row}."curriculum_id"'),
+    ('table_course_plo', 'id', '{row}."curriculum_id"'),
+    ('table_yloperplosemester', 'id', '{row}."curriculum_id"'),
+    ('table_ksecitem', 'id', '{row}."curriculum_id"'),
+    ('table_course_ksec', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_clo', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_clo_ksec', 'id', '(SELECT (SELECT p1."curriculum_id" FROM "table_course" AS p1 WHERE p1."id" = p0."course_id") FROM "table_clo" AS p0 WHERE p0."id" = {row}."clo_id")'),
+    ('table_clo_summary', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_plo_summary', 'id', '{row}."curriculum_id"'),
+]
+
+OPS = {'INSERT': ('I', 'NEW'), 'UPDATE': ('U', 'NEW'), 'DELETE': ('D', 'OLD')}
+
+
+def journal_triggers(table, pk, curriculum_sql):
+    # Frozen copy of table.journal.journal_triggers
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS "{table}_journal_{event.lower()}" '
+        f'AFTER {event} ON "{table}" FOR EACH ROW BEGIN '
+        f'INSERT INTO "{JOURNAL_TABLE}" ("curriculum_id", "table_name", "row_id", "op") '
+        f"VALUES ({curriculum_sql.format(row=row)}, '{table}', {row}.\"{pk}\", '{op}'); "
+        f'END'
+        for event, (op, row) in OPS.items()
+    ]
+
+
+def install_journal(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.alias in JOURNAL_DATABASES and connection.vendor == 'sqlite':
+        for table, pk, curriculum_sql in JOURNALED_TABLES:
+            for statement in journal_triggers(table, pk, curriculum_sql):
+                schema_editor.execute(statement)
+
+
+def drop_journal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for table, _, _ in JOURNALED_TABLES:
+            for event in OPS:
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS "{table}_journal_{event.lower()}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0020_curriculum_ksec_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('curriculum_id', models.IntegerField(unique=True)),
+                ('last_change_id', models.BigIntegerField(default=0)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'table_sync_cursor',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeJournal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('curriculum_id', models.IntegerField(null=True)),
+                ('table_name', models.CharField(max_length=64)),
+                ('row_id', models.BigIntegerField()),
+                ('op', models.CharField(choices=[('I', 'Insert'), ('U', 'Update'), ('D', 'Delete')], max_length=1)),
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                'db_table': 'table_change_journal',
+                'indexes': [models.Index(fields=['curriculum_id', 'id'], name='change_journal_curr_idx')],
+            },
+        ),
+        # Triggers on the journaled database(s) only
+        migrations.RunPython(install_journal, drop_journal),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of table.journal's triggers as of this migration (see 0021):
+# the example database is journaled too, and table_plo_summary is keyed by credit_row_id.
+JOURNAL_DATABASES = ['real', 'default']
+
+JOURNAL_TABLE = 'table_change_journal'
+
+JOURNALED_TABLES = [
+    ('table_curriculum', 'id', '{row}."id"'),
+    ('table_creditrow', 'id', '{row}."curriculum_id"'),
+    ('table_course', 'id', '{row}."curriculum_id"'),
+    ('table_course_plo', 'id', '{row}."curriculum_id"'),
+    ('table_yloperplosemester', 'id', '{row}."curriculum_id"'),
+    ('table_ksecitem', 'id', '{row}."curriculum_id"'),
+    ('table_course_ksec', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_clo', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_clo_ksec', 'id', '(SELECT (SELECT p1."curriculum_id" FROM "table_course" AS p1 WHERE p1."id" = p0."course_id") FROM "table_clo" AS p0 WHERE p0."id" = {row}."clo_id")'),
+    ('table_clo_summary', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_plo_summary', 'credit_row_id', '{row}."curriculum_id"'),
+]
+
+OPS = {'INSERT': ('I', 'NEW'), 'UPDATE': ('U', 'NEW'), 'DELETE': ('D', 'OLD')}
+
+
+def journal_triggers(table, pk, curriculum_sql):
+    # Frozen copy of table.journal.journal_triggers
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS "{table}_journal_{event.lower()}" '
+        f'AFTER {event} ON "{table}" FOR EACH ROW BEGIN '
+        f'INSERT INTO "{JOURNAL_TABLE}" ("curriculum_id", "table_name", "row_id", "op") '
+        f"VALUES ({curriculum_sql.format(row=row)}, '{table}', {row}.\"{pk}\", '{op}'); "
+        f'END'
+        for event, (op, row) in OPS.items()
+    ]
+
+
+def reinstall_journal(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    for table, pk, curriculum_sql in JOURNALED_TABLES:
+        for event in OPS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS "{table}_journal_{event.lower()}"')
+        if connection.alias in JOURNAL_DATABASES:
+            for statement in journal_triggers(table, pk, curriculum_sql):
+                schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0021_change_journal'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='plosummary',
+            name='id',
+        ),
+        migrations.RemoveField(
+            model_name='plosummary',
+            name='updated_at',
+        ),
+        migrations.AlterField(
+            model_name='plosummary',
+            name='credit_row',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='plo_summary', serialize=False, to='table.creditrow'),
+        ),
+        migrations.CreateModel(
+            name='SyncDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('curriculum_id', models.IntegerField()),
+                ('table_name', models.CharField(max_length=64)),
+                ('bucket', models.IntegerField()),
+                ('digest', models.CharField(max_length=64)),
+                ('through_change_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'table_sync_digest',
+                'constraints': [models.UniqueConstraint(fields=('curriculum_id', 'table_name', 'bucket'), name='unique_sync_digest')],
+            },
+        ),
+        # Rebuilding table_plo_summary dropped its triggers; the example database is journaled from now on
+        migrations.RunPython(reinstall_journal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+# Frozen copy of table.journal's triggers as of this migration (see 0022):
+# only the real database is journaled again. Example's journal was read by
+# nothing but its own digests, which are now hashed in full instead.
+JOURNAL_DATABASES = ['real']
+PREVIOUS_JOURNAL_DATABASES = ['real', 'default']
+
+JOURNAL_TABLE = 'table_change_journal'
+
+JOURNALED_TABLES = [
+    ('table_curriculum', 'id', '{row}."id"'),
+    ('table_creditrow', 'id', '{row}."curriculum_id"'),
+    ('table_course', 'id', '{row}."curriculum_id"'),
+    ('table_course_plo', 'id', '{row}."curriculum_id"'),
+    ('table_yloperplosemester', 'id', '{row}."curriculum_id"'),
+    ('table_ksecitem', 'id', '{row}."curriculum_id"'),
+    ('table_course_ksec', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_clo', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_clo_ksec', 'id', '(SELECT (SELECT p1."curriculum_id" FROM "table_course" AS p1 WHERE p1."id" = p0."course_id") FROM "table_clo" AS p0 WHERE p0."id" = {row}."clo_id")'),
+    ('table_clo_summary', 'id', '(SELECT p0."curriculum_id" FROM "table_course" AS p0 WHERE p0."id" = {row}."course_id")'),
+    ('table_plo_summary', 'credit_row_id', '{row}."curriculum_id"'),
+]
+
+OPS = {'INSERT': ('I', 'NEW'), 'UPDATE': ('U', 'NEW'), 'DELETE': ('D', 'OLD')}
+
+
+def journal_triggers(table, pk, curriculum_sql):
+    # Frozen copy of table.journal.journal_triggers
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS "{table}_journal_{event.lower()}" '
+        f'AFTER {event} ON "{table}" FOR EACH ROW BEGIN '
+        f'INSERT INTO "{JOURNAL_TABLE}" ("curriculum_id", "table_name", "row_id", "op") '
+        f"VALUES ({curriculum_sql.format(row=row)}, '{table}', {row}.\"{pk}\", '{op}'); "
+        f'END'
+        for event, (op, row) in OPS.items()
+    ]
+
+
+def reinstall_journal(connection, schema_editor, databases):
+    for table, pk, curriculum_sql in JOURNALED_TABLES:
+        for event in OPS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS "{table}_journal_{event.lower()}"')
+        if connection.alias in databases:
+            for statement in journal_triggers(table, pk, curriculum_sql):
+                schema_editor.execute(statement)
+
+
+def journal_real_only(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    reinstall_journal(connection, schema_editor, JOURNAL_DATABASES)
+    if connection.alias not in JOURNAL_DATABASES:
+        schema_editor.execute(f'DELETE FROM "{JOURNAL_TABLE}"')
+
+
+def journal_example_too(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        reinstall_journal(connection, schema_editor, PREVIOUS_JOURNAL_DATABASES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('table', '0022_sync_digest'),
+    ]
+
+    operations = [
+        migrations.RunPython(journal_real_only, journal_example_too),
+    ]
@@ -1,4 +1,94 @@
+import re
+import uuid
+
 from django.db import models
+from django.db.models.functions import Now
+
+
+# ✅ PLO tags such as "PLO1", "PLO1:", "plo 2" (Course.plo, CreditRow.name, YLO keys)
+PLO_TAG_RE = re.compile(r'PLO\s*(\d+)', re.IGNORECASE)
+
+
+def parse_plo_tags(text):
+    """
+    Parse free-text PLO references into normalized tags.
+    'PLO1:, plo 2' -> ['PLO1', 'PLO2'] (in order, without duplicates).
+    """
+    tags = []
+    for number in PLO_TAG_RE.findall(text or ''):
+        tag = f"PLO{int(number)}"
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def parse_ksec_codes(text):
+    """
+    Parse comma-separated KSEC codes (Course.knowledge, CLO.k, ...).
+    'GE(K)1, CE (K)3' -> ['GE(K)1', 'CE(K)3'] (in order, without duplicates).
+    """
+    codes = []
+    for item in (text or '').split(','):
+        code = item.strip().replace(" ", "")
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+
+def new_ksec_version():
+    return uuid.uuid4().hex
+
+
+def ksec_code_map(db, curriculum_id):
+    """Return {code: KSECItem id} for one curriculum, e.g. {'GE(K)1': 12} (cached, do not modify)."""
+    from .ksec_cache import ksec_dictionary
+    return ksec_dictionary(db, curriculum_id).code_ids
+
+
+def sync_ksec_links(link_model, owner_field, owner, item_ids):
+    """Replace the KSEC links of one Course/CLO with `item_ids` (no-op if unchanged)."""
+    db = owner._state.db
+    links = link_model.objects.using(db).filter(**{owner_field: owner})
+    existing = set(links.values_list('ksec_item_id', flat=True))
+    if existing == item_ids:
+        return
+
+    links.exclude(ksec_item_id__in=item_ids).delete()
+    link_model.objects.using(db).bulk_create([
+        link_model(**{owner_field: owner, 'ksec_item_id': item_id})
+        for item_id in item_ids - existing
+    ])
+
+
+def relink_ksec_items(db, curriculum_id):
+    """
+    Rebuild all Course/CLO → KSECItem links of a curriculum from the stored codes.
+    Needed after KSEC items are added, removed or re-ordered (codes follow sort_order).
+    """
+    code_map = ksec_code_map(db, curriculum_id)
+
+    CourseKSEC.objects.using(db).filter(course__curriculum_id=curriculum_id).delete()
+    CLOKSEC.objects.using(db).filter(clo__course__curriculum_id=curriculum_id).delete()
+
+    courses = Course.objects.using(db).filter(curriculum_id=curriculum_id).values_list(
+        'id', *Course.KSEC_FIELDS
+    )
+    CourseKSEC.objects.using(db).bulk_create([
+        CourseKSEC(course_id=course_id, ksec_item_id=code_map[code])
+        for course_id, *texts in courses
+        for code in parse_ksec_codes(','.join(text or '' for text in texts))
+        if code in code_map
+    ], batch_size=500)
+
+    clos = CLO.objects.using(db).filter(course__curriculum_id=curriculum_id).values_list(
+        'id', *CLO.KSEC_FIELDS
+    )
+    CLOKSEC.objects.using(db).bulk_create([
+        CLOKSEC(clo_id=clo_id, ksec_item_id=code_map[code])
+        for clo_id, *texts in clos
+        for code in parse_ksec_codes(','.join(text or '' for text in texts))
+        if code in code_map
+    ], batch_size=500)
 
 
 class Curriculum(models.Model):
@@ -15,6 +105,8 @@ class Curriculum(models.Model):
         null=True,
         help_text="Password required to unlock the CLO–KSEC Mapping interface."
     )
+    # ✅ Changes whenever this curriculum's KSEC items are edited (see table.ksec_cache)
+    ksec_version = models.CharField(max_length=32, default=new_ksec_version, editable=False)
 
     def __str__(self):
         return self.name
@@ -79,23 +171,91 @@ class Course(models.Model):
     ethics = models.TextField(blank=True, null=True)
     character = models.TextField(blank=True, null=True)
 
+    KSEC_FIELDS = ('knowledge', 'skills', 'ethics', 'character')
+
+    class Meta:
+        indexes = [
+            # PLO course lists / YLO study plan
+            models.Index(fields=['curriculum', 'semester', 'plo'], name='course_curr_sem_plo_idx'),
+            # course_list for General/Core rows
+            models.Index(fields=['curriculum', 'credit_row', 'semester'], name='course_curr_row_sem_idx'),
+            # course_list for Free Electives
+            models.Index(fields=['curriculum', 'category', 'semester'], name='course_curr_cat_sem_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'plo' in update_fields:
+            self.sync_plo_links()
+        if update_fields is None or set(update_fields) & set(self.KSEC_FIELDS):
+            self.sync_ksec_links()
+
+    def sync_plo_links(self):
+        """Keep CoursePLO rows in step with the free-text `plo` field."""
+        db = self._state.db
+        tags = parse_plo_tags(self.plo)
+        links = CoursePLO.objects.using(db).filter(course=self)
+        existing = set(links.values_list('plo', flat=True))
+        if existing == set(tags):
+            return
+
+        links.exclude(plo__in=tags).delete()
+        CoursePLO.objects.using(db).bulk_create([
+            CoursePLO(curriculum_id=self.curriculum_id, course=self, plo=tag)
+            for tag in tags if tag not in existing
+        ])
+
+    def sync_ksec_links(self):
+        """Keep CourseKSEC rows in step with knowledge/skills/ethics/character."""
+        code_map = ksec_code_map(self._state.db, self.curriculum_id)
+        codes = parse_ksec_codes(','.join(getattr(self, f) or '' for f in self.KSEC_FIELDS))
+        sync_ksec_links(CourseKSEC, 'course', self, {code_map[c] for c in codes if c in code_map})
+
     def __str__(self):
         return f'{self.course_code} - {self.course_name}'
 
 
+class CoursePLO(models.Model):
+    """
+    Normalized Course ↔ PLO link, parsed from Course.plo when the course is saved.
+    `curriculum` is denormalized so PLO lookups hit a single index.
+    """
+    curriculum = models.ForeignKey(Curriculum, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='plo_links')
+    plo = models.CharField(max_length=10)
+
+    class Meta:
+        db_table = 'table_course_plo'
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'plo'], name='unique_course_plo'),
+        ]
+        indexes = [
+            models.Index(fields=['curriculum', 'plo'], name='course_plo_curr_plo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.course.course_code} → {self.plo}"
+
+
 class YLOPerPLOSemester(models.Model):
     curriculum = models.ForeignKey(Curriculum, on_delete=models.CASCADE)
     plo = models.CharField(max_length=50)
     semester = models.PositiveSmallIntegerField()
     summary_text = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['curriculum', 'plo', 'semester'], name='ylo_curr_plo_sem_idx'),
+        ]
+
     def __str__(self):
         return f"YLO Summary for {self.plo} - Semester {self.semester}"
 
 
 class KSECItem(models.Model):
     curriculum = models.ForeignKey(Curriculum, on_delete=models.CASCADE)
-    semester = models.IntegerField()
+    semester = models.IntegerField(default=0)
     type = models.CharField(
         max_length=1,
         choices=[
@@ -115,6 +275,16 @@ class KSECItem(models.Model):
     description = models.TextField()
     sort_order = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['curriculum', 'type', 'semester', 'sort_order'], name='ksec_curr_type_sem_ord_idx'),
+        ]
+
+    @property
+    def code(self):
+        """Display code such as 'GE(K)1' (sort_order is 0-based)."""
+        return f"{self.category_type}({self.type}){self.sort_order + 1}".replace(" ", "")
+
     def __str__(self):
         return f"{self.category_type}({self.type}){self.sort_order + 1}"
 
@@ -129,14 +299,58 @@ class CLO(models.Model):
     e = models.CharField(max_length=20, blank=True, null=True)
     c = models.CharField(max_length=20, blank=True, null=True)
 
+    KSEC_FIELDS = ('k', 's', 'e', 'c')
+
     class Meta:
         db_table = 'table_clo'
         ordering = ['index']
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.KSEC_FIELDS):
+            self.sync_ksec_links()
+
+    def sync_ksec_links(self):
+        """Keep CLOKSEC rows in step with the k/s/e/c code fields."""
+        code_map = ksec_code_map(self._state.db, self.course.curriculum_id)
+        codes = parse_ksec_codes(','.join(getattr(self, f) or '' for f in self.KSEC_FIELDS))
+        sync_ksec_links(CLOKSEC, 'clo', self, {code_map[c] for c in codes if c in code_map})
+
     def __str__(self):
         return f"{self.course.course_code} - CLO{self.index}"
 
 
+class CourseKSEC(models.Model):
+    """KSEC items selected for a course (parsed from Course.knowledge/skills/...)."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='ksec_links')
+    ksec_item = models.ForeignKey(KSECItem, on_delete=models.CASCADE, related_name='course_links')
+
+    class Meta:
+        db_table = 'table_course_ksec'
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'ksec_item'], name='unique_course_ksec'),
+        ]
+        indexes = [
+            models.Index(fields=['ksec_item', 'course'], name='course_ksec_item_idx'),
+        ]
+
+
+class CLOKSEC(models.Model):
+    """KSEC items mapped to a CLO (parsed from CLO.k/s/e/c)."""
+    clo = models.ForeignKey(CLO, on_delete=models.CASCADE, related_name='ksec_links')
+    ksec_item = models.ForeignKey(KSECItem, on_delete=models.CASCADE, related_name='clo_links')
+
+    class Meta:
+        db_table = 'table_clo_ksec'
+        constraints = [
+            models.UniqueConstraint(fields=['clo', 'ksec_item'], name='unique_clo_ksec'),
+        ]
+        indexes = [
+            models.Index(fields=['ksec_item', 'clo'], name='clo_ksec_item_idx'),
+        ]
+
+
 class CLOSummary(models.Model):
     course = models.OneToOneField(Course, on_delete=models.CASCADE)
     bloom_score = models.IntegerField(default=0)
@@ -150,3 +364,93 @@ class CLOSummary(models.Model):
 
     def __str__(self):
         return f"Summary for {self.course.course_code}"
+
+
+class PLOSummary(models.Model):
+    """
+    Materialized plo_summary content for one PLO row: the course list (CLOs,
+    de-duplicated KSEC labels, CLOSummary percentages), max Bloom and credit
+    totals. Rebuilt per PLO by table.plo_summaries when the underlying rows change.
+    Keyed by the PLO row, so rebuilding it in two databases gives identical rows.
+    """
+    curriculum = models.ForeignKey(Curriculum, on_delete=models.CASCADE, related_name='plo_summaries')
+    credit_row = models.OneToOneField(
+        CreditRow, on_delete=models.CASCADE, primary_key=True, related_name='plo_summary'
+    )
+    plo = models.CharField(max_length=10, blank=True)   # normalized tag, e.g. 'PLO1'
+    label = models.CharField(max_length=200)            # heading key shown on the page
+    description = models.CharField(max_length=200)
+    course_count = models.IntegerField(default=0)
+    total_credits = models.IntegerField(default=0)
+    max_bloom = models.IntegerField(null=True, blank=True)
+    courses = models.JSONField(default=list)
+
+    class Meta:
+        db_table = 'table_plo_summary'
+        indexes = [
+            models.Index(fields=['curriculum', 'credit_row'], name='plo_summary_curr_row_idx'),
+            models.Index(fields=['curriculum', 'plo'], name='plo_summary_curr_plo_idx'),
+        ]
+
+    def __str__(self):
+        return f"Summary for {self.label}"
+
+
+class ChangeJournal(models.Model):
+    """
+    Append-only log of row changes on the journaled database (written by the
+    SQLite triggers in table.journal, never by the ORM). Backups replay the
+    entries newer than the target's SyncCursor.
+    """
+    OPS = [('I', 'Insert'), ('U', 'Update'), ('D', 'Delete')]
+
+    curriculum_id = models.IntegerField(null=True)
+    table_name = models.CharField(max_length=64)
+    row_id = models.BigIntegerField()
+    op = models.CharField(max_length=1, choices=OPS)
+    created_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        db_table = 'table_change_journal'
+        indexes = [
+            models.Index(fields=['curriculum_id', 'id'], name='change_journal_curr_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.op} {self.table_name}:{self.row_id}"
+
+
+class SyncCursor(models.Model):
+    """Last ChangeJournal id of the source already applied to this database, per curriculum."""
+    curriculum_id = models.IntegerField(unique=True)
+    last_change_id = models.BigIntegerField(default=0)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'table_sync_cursor'
+
+    def __str__(self):
+        return f"Curriculum {self.curriculum_id} synced through #{self.last_change_id}"
+
+
+class SyncDigest(models.Model):
+    """
+    Content digest of one curriculum's rows in this database, kept by
+    table.drift. One row per (table, bucket of DIGEST_BUCKET ids) plus a root
+    row (table_name '') over all buckets, current through `through_change_id`
+    of this database's ChangeJournal.
+    """
+    curriculum_id = models.IntegerField()
+    table_name = models.CharField(max_length=64)
+    bucket = models.IntegerField()
+    digest = models.CharField(max_length=64)
+    through_change_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'table_sync_digest'
+        constraints = [
+            models.UniqueConstraint(fields=['curriculum_id', 'table_name', 'bucket'], name='unique_sync_digest'),
+        ]
+
+    def __str__(self):
+        return f"Curriculum {self.curriculum_id} {self.table_name or 'root'}[{self.bucket}] {self.digest[:12]}"
@@ -0,0 +1,160 @@
+"""
+Materialized PLO summaries (PLOSummary rows) behind the plo_summary page.
+
+The page reads them with one indexed query. Writers call
+refresh_plo_summaries() for the PLOs they touched (or for the whole
+curriculum), which rebuilds just those rows from a fixed number of queries.
+"""
+
+from django.db import DatabaseError, transaction
+from django.db.models import Prefetch
+
+from .aggregates import plo_row_tag
+from .ksec_cache import ksec_dictionary
+from .models import CreditRow, CoursePLO, CLO, CLOKSEC, PLOSummary, parse_plo_tags
+from .readonly import writable_alias
+
+
+KSEC_TYPES = ['K', 'S', 'E', 'C']
+PERCENT_FIELDS = ['k_percent', 's_percent', 'e_percent', 'c_percent']
+
+
+def course_plo_tags(db, course_ids):
+    """PLO tags currently linked to any of `course_ids`."""
+    return set(CoursePLO.objects.using(db).filter(course_id__in=course_ids).values_list('plo', flat=True))
+
+
+def course_entry(course, ksec):
+    """One course of the page, as plain data (CLOs, grouped KSEC labels, CLOSummary)."""
+    clo_objs = list(course.clo_set.all())
+    clo_summary = getattr(course, 'closummary', None)
+    max_bloom = clo_summary.bloom_score if clo_summary else None
+
+    clos = []
+    for i, clo in enumerate(clo_objs):
+        line = clo.clo.strip()
+        # Append "(Max Bloom: X)" to the last CLO line if available
+        if i == len(clo_objs) - 1 and max_bloom is not None:
+            line += f'<br><span class="text-blue">(Max Bloom: {max_bloom})</span>'
+        clos.append(line)
+
+    # Group K/S/E/C (code + description), de-duplicated across the CLOs
+    ksec_grouped = {typ: [] for typ in KSEC_TYPES}
+    for clo in clo_objs:
+        for link in clo.ksec_links.all():
+            item = ksec.by_id.get(link.ksec_item_id)
+            if item is None:
+                continue
+            label = f"{item.code}: {item.description.strip()}"
+            if label not in ksec_grouped[item.type]:
+                ksec_grouped[item.type].append(label)
+
+    # Course name + optional description (new line in parentheses)
+    course_name_display = course.course_name.strip()
+    if course.description:
+        course_name_display += f"<br>({course.description.strip()})"
+
+    return {
+        'course_code': course.course_code,
+        'course_name': course_name_display,
+        'clos': clos,
+        'ksec_grouped': ksec_grouped,
+        'credits': course.credits or 0,
+        'bloom_score': max_bloom,
+        'clo_summary': {f: getattr(clo_summary, f) for f in PERCENT_FIELDS} if clo_summary else None,
+    }
+
+
+def build_plo_summaries(db, curriculum_id, plo_rows):
+    """Unsaved PLOSummary objects for `plo_rows` (fixed number of queries)."""
+    tags = {plo_row_tag(row) for row in plo_rows} - {''}
+
+    # Courses of these PLOs with CLOSummary, their CLOs and the CLOs' KSEC items
+    links = CoursePLO.objects.using(db).filter(
+        curriculum_id=curriculum_id, plo__in=tags
+    ).select_related(
+        'course', 'course__closummary'
+    ).prefetch_related(
+        Prefetch('course__clo_set', queryset=CLO.objects.using(db).order_by('index', 'id')),
+        Prefetch(
+            'course__clo_set__ksec_links',
+            queryset=CLOKSEC.objects.using(db).order_by('id'),
+        ),
+    ).order_by('course_id')
+
+    ksec = ksec_dictionary(db, curriculum_id)
+    courses_by_plo = {}
+    for link in links:
+        courses_by_plo.setdefault(link.plo, []).append(course_entry(link.course, ksec))
+
+    summaries = []
+    for row in plo_rows:
+        tag = plo_row_tag(row)
+        courses = courses_by_plo.get(tag, [])
+        blooms = [c['bloom_score'] for c in courses if c['bloom_score'] is not None]
+        summaries.append(PLOSummary(
+            curriculum_id=curriculum_id,
+            credit_row=row,
+            plo=tag,
+            label=row.name.split(':')[0].strip(),
+            description=row.name.strip(),
+            course_count=len(courses),
+            total_credits=sum(c['credits'] for c in courses),
+            max_bloom=max(blooms, default=None),
+            courses=courses,
+        ))
+    return summaries
+
+
+def plo_rows_of(db, curriculum_id):
+    return [
+        row for row in CreditRow.objects.using(db).filter(
+            curriculum_id=curriculum_id, row_type='plo'
+        ).order_by('id')
+        if row.name
+    ]
+
+
+def refresh_plo_summaries(db, curriculum_id, plo_tags=None):
+    """
+    Rebuild the PLOSummary rows of one curriculum in `db`.
+    `plo_tags` limits the rebuild to those PLOs (e.g. {'PLO1', 'PLO3'});
+    None rebuilds every PLO row (and drops rows of removed PLOs).
+    """
+    plo_rows = plo_rows_of(db, curriculum_id)
+    if plo_tags is not None:
+        plo_tags = {tag for tags in map(parse_plo_tags, plo_tags) for tag in tags}
+        plo_rows = [row for row in plo_rows if plo_row_tag(row) in plo_tags]
+        if not plo_rows:
+            return 0
+
+    summaries = build_plo_summaries(db, curriculum_id, plo_rows)
+    with transaction.atomic(using=db):
+        stale = PLOSummary.objects.using(db).filter(curriculum_id=curriculum_id)
+        if plo_tags is not None:
+            stale = stale.filter(credit_row__in=plo_rows)
+        stale.delete()
+        PLOSummary.objects.using(db).bulk_create(summaries)
+    return len(summaries)
+
+
+def load_plo_summaries(db, curriculum_id):
+    """
+    PLOSummary rows in page order. A curriculum without any (never built,
+    e.g. an older database file) is built on the spot and stored when the
+    database is writable (through 'default' for the read-only view alias);
+    otherwise the freshly built rows are just returned.
+    """
+    rows = list(PLOSummary.objects.using(db).filter(curriculum_id=curriculum_id).order_by('credit_row_id'))
+    if rows:
+        return rows
+
+    rows = build_plo_summaries(db, curriculum_id, plo_rows_of(db, curriculum_id))
+    if rows:
+        store = writable_alias(db)
+        try:
+            with transaction.atomic(using=store):
+                PLOSummary.objects.using(store).bulk_create(rows)
+        except DatabaseError:
+            pass   # read-only database: serve without storing
+    return rows
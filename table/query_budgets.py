@@ -0,0 +1,51 @@
+"""
+Maximum SQL queries per request, for `python manage.py check_query_budgets`.
+
+Keys are URL names from table/urls.py; each maps a case to its budget:
+'view' / 'edit' is a GET in that access mode, '<mode> POST' a form
+submission. Counts cover both databases, without the session and login
+lookups, for the fixture curriculum below. Every URL in table/urls.py
+must have an entry; lower a budget when a view gets cheaper.
+
+Views in SIZE_INDEPENDENT are also requested for a FIXTURE curriculum and a
+SCALED_FIXTURE one (four times the courses); their query counts must be equal.
+"""
+
+# Fixture curriculum (table.synthetic.generate_curriculum), loaded into 'real' and 'default'
+FIXTURE = {
+    'plos': 13,
+    'courses_per_semester': 8,
+    'clos_per_course': 5,
+    'ksec_per_type': 10,
+}
+SCALED_FIXTURE = {**FIXTURE, 'courses_per_semester': 32}
+
+# Views whose query count must not grow with the number of courses
+SIZE_INDEPENDENT = ['plo_summary']
+
+QUERY_BUDGETS = {
+    'curriculum_select': {'view': 1, 'edit': 1, 'edit POST': 3},
+    'credit_table': {'view': 3, 'edit': 3, 'edit POST': 72},
+    'reset_credit_table': {'edit POST': 36},
+    'course_list': {'view': 4, 'edit': 4},
+    'save_course_list': {'edit POST': 17},
+    'reset_course_list': {'edit POST': 22},
+    'plo_course_list': {'view': 6, 'edit': 6},
+    'save_plo_course_list': {'edit POST': 7},
+    'ylo_study_plan': {'view': 3, 'edit': 3},
+    'save_ylo_studyplan': {'edit POST': 34},
+    'ksec_edit': {'view': 2, 'edit': 2, 'edit POST': 45},
+    'ksec_item_select': {'view': 1, 'edit': 1},
+    'sync_real_to_example': {'edit': 0, 'edit POST': 44},
+    'cache_stats': {'edit': 0},
+    'sync_curriculum_real_to_example': {'edit POST': 61},
+    'sync_curriculum_example_to_real': {'edit POST': 32},
+    'download_all_databases': {'view': 0},
+    'download_database': {'view': 0, 'edit': 0},
+    'clo_ksec_map': {'view': 6, 'edit': 6},
+    'save_clo_ksec_map': {'edit POST': 58},
+    'reset_clo_ksec_map': {'edit POST': 39},
+    'save_clo_ksec_to_session': {'view POST': 3},
+    'plo_summary': {'view': 2, 'edit': 2},
+    'plo_graph_from_creditrow': {'view': 1, 'edit': 1},
+}
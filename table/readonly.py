@@ -0,0 +1,58 @@
+"""
+Read-only connection to the example database.
+
+View-mode pages read through VIEW_DB: example.sqlite3 opened with a
+`mode=ro` URI, `query_only` and a large mmap (settings.DATABASES). Writes to
+that file (backups, syncs, CLO saves, digests) keep going through 'default'
+and are committed in place, so readers see them like any other commit.
+
+A persistent connection holds on to the file it opened. When the file is
+replaced instead (a new inode: first-time creation, a restored download, a
+deploy), close_replaced_connections() — run at the start of every request —
+closes the stale connections (read-only or not) so the next query reopens
+the new file.
+"""
+
+import os
+from urllib.parse import unquote, urlparse
+
+from django.db import connections
+
+VIEW_DB = 'example_ro'
+
+
+def writable_alias(alias):
+    """The alias that writes the file `alias` reads."""
+    return 'default' if alias == VIEW_DB else alias
+
+
+def database_path(settings_dict):
+    """Filesystem path of a SQLite NAME, which may be a `file:` URI."""
+    name = str(settings_dict['NAME'])
+    if name.startswith('file:'):
+        return unquote(urlparse(name).path)
+    return name
+
+
+def file_identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+def remember_file_identity(sender, connection, **kwargs):
+    """connection_created: note which file a SQLite connection opened."""
+    if connection.vendor == 'sqlite':
+        connection.file_identity = file_identity(database_path(connection.settings_dict))
+
+
+def close_replaced_connections(**kwargs):
+    """request_started: drop this thread's SQLite connections whose file was replaced."""
+    for connection in connections.all(initialized_only=True):
+        if connection.vendor != 'sqlite' or connection.connection is None or connection.in_atomic_block:
+            continue
+        current = file_identity(database_path(connection.settings_dict))
+        if current != getattr(connection, 'file_identity', None):
+            connection.close()
@@ -0,0 +1,165 @@
+from django.db import connections, transaction
+
+from .models import (
+    Curriculum, CreditRow, Course, CoursePLO, YLOPerPLOSemester, KSECItem,
+    CourseKSEC, CLO, CLOKSEC, CLOSummary, PLOSummary,
+)
+
+
+# ✅ Everything that belongs to one curriculum, parents before children.
+# (model, lookup that reaches Curriculum.id)
+CURRICULUM_GRAPH = [
+    (CreditRow, 'curriculum_id'),
+    (Course, 'curriculum_id'),
+    (CoursePLO, 'curriculum_id'),
+    (YLOPerPLOSemester, 'curriculum_id'),
+    (KSECItem, 'curriculum_id'),
+    (CourseKSEC, 'course__curriculum_id'),
+    (CLO, 'course__curriculum_id'),
+    (CLOKSEC, 'clo__course__curriculum_id'),
+    (CLOSummary, 'course__curriculum_id'),
+    (PLOSummary, 'curriculum_id'),
+]
+
+BATCH_SIZE = 500
+
+
+def curriculum_rows(model, lookup, curriculum_id, db):
+    return model.objects.using(db).filter(**{lookup: curriculum_id})
+
+
+def replicate_curriculum(curriculum_id, source, target):
+    """
+    Copy one curriculum from `source` to `target`, replacing what the target had.
+    Uses the in-engine SQLite path when both aliases are SQLite files,
+    otherwise the ORM path. Returns {model name: rows copied}.
+    """
+    if can_attach(source, target):
+        return replicate_curriculum_sqlite(curriculum_id, source, target)
+    return replicate_curriculum_orm(curriculum_id, source, target)
+
+
+def replicate_curriculum_orm(curriculum_id, source, target):
+    """
+    ORM path: works on any backend. Primary keys are preserved, so links
+    between rows stay valid without remapping.
+
+    Runs inside one atomic block per database: the source is read as a
+    consistent snapshot and the target is either fully replaced or untouched.
+    Uses a fixed number of queries per model (bulk_create in batches).
+    """
+    with transaction.atomic(using=source), transaction.atomic(using=target):
+        curriculum = Curriculum.objects.using(source).get(id=curriculum_id)
+
+        # Read everything first (one query per model)
+        snapshot = [
+            (model, lookup, list(curriculum_rows(model, lookup, curriculum_id, source)))
+            for model, lookup in CURRICULUM_GRAPH
+        ]
+
+        # Wipe the target, children first
+        for model, lookup in reversed(CURRICULUM_GRAPH):
+            curriculum_rows(model, lookup, curriculum_id, target).delete()
+
+        # Curriculum itself is updated in place (never deleted) to keep other references
+        curriculum.save(using=target)
+
+        counts = {}
+        for model, _, rows in snapshot:
+            model.objects.using(target).bulk_create(rows, batch_size=BATCH_SIZE)
+            counts[model.__name__] = len(rows)
+
+    return counts
+
+
+# ---------- SQLite fast path (ATTACH + INSERT ... SELECT) ----------
+ATTACH_SCHEMA = 'sync_src'
+
+
+def can_attach(source, target):
+    """Both aliases are SQLite files and the target is not inside a transaction."""
+    src, dst = connections[source], connections[target]
+    return (
+        src.vendor == dst.vendor == 'sqlite'
+        and not src.is_in_memory_db()
+        and not dst.is_in_memory_db()
+        and not dst.in_atomic_block
+    )
+
+
+def curriculum_where(model, lookup, schema):
+    """
+    SQL condition selecting one curriculum's rows of `model` in `schema`,
+    e.g. CLO / 'course__curriculum_id' ->
+    "course_id" IN (SELECT "id" FROM sync_src."table_course" WHERE "curriculum_id" = %s)
+    """
+    *path, column = lookup.split('__')
+    if not path:
+        return f'"{column}" = %s'
+
+    field = model._meta.get_field(path[0])
+    related = field.related_model
+    inner = curriculum_where(related, '__'.join(path[1:] + [column]), schema)
+    return (
+        f'"{field.column}" IN (SELECT "{related._meta.pk.column}" '
+        f'FROM {schema}."{related._meta.db_table}" WHERE {inner})'
+    )
+
+
+def replicate_curriculum_sqlite(curriculum_id, source, target):
+    """
+    SQLite path: ATTACH the source file to the target connection and move the
+    curriculum table by table with INSERT ... SELECT — no model instances.
+    Deletes and inserts run in one target transaction (which also gives a
+    consistent read of the attached file). Same result as the ORM path.
+    """
+    connection = connections[target]
+    source_file = str(connections[source].settings_dict['NAME'])
+
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute(f'ATTACH DATABASE %s AS {ATTACH_SCHEMA}', [source_file])
+    try:
+        with transaction.atomic(using=target), connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT 1 FROM {ATTACH_SCHEMA}."{Curriculum._meta.db_table}" WHERE "id" = %s',
+                [curriculum_id],
+            )
+            if cursor.fetchone() is None:
+                raise Curriculum.DoesNotExist(f"Curriculum {curriculum_id} not found in '{source}'")
+
+            # Wipe the target, children first
+            for model, lookup in reversed(CURRICULUM_GRAPH):
+                cursor.execute(
+                    f'DELETE FROM main."{model._meta.db_table}" '
+                    f'WHERE {curriculum_where(model, lookup, "main")}',
+                    [curriculum_id],
+                )
+
+            # Curriculum: upsert in place (never deleted)
+            columns = [f.column for f in Curriculum._meta.concrete_fields]
+            column_sql = ', '.join(f'"{c}"' for c in columns)
+            updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c != 'id')
+            cursor.execute(
+                f'INSERT INTO main."{Curriculum._meta.db_table}" ({column_sql}) '
+                f'SELECT {column_sql} FROM {ATTACH_SCHEMA}."{Curriculum._meta.db_table}" '
+                f'WHERE "id" = %s ON CONFLICT("id") DO UPDATE SET {updates}',
+                [curriculum_id],
+            )
+
+            counts = {}
+            for model, lookup in CURRICULUM_GRAPH:
+                table = model._meta.db_table
+                column_sql = ', '.join(f'"{f.column}"' for f in model._meta.concrete_fields)
+                cursor.execute(
+                    f'INSERT INTO main."{table}" ({column_sql}) '
+                    f'SELECT {column_sql} FROM {ATTACH_SCHEMA}."{table}" '
+                    f'WHERE {curriculum_where(model, lookup, ATTACH_SCHEMA)}',
+                    [curriculum_id],
+                )
+                counts[model.__name__] = cursor.rowcount
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DETACH DATABASE {ATTACH_SCHEMA}')
+
+    return counts
@@ -0,0 +1,43 @@
+"""
+Session engine: Django's database sessions, kept in sessions.sqlite3.
+
+SessionRouter (PLO_curriculumDsgn1/dbrouters.py) sends the sessions app to
+the 'sessions' alias, so saving access_mode or CLO drafts never waits for
+(or holds) the write lock of real.sqlite3. Expired rows are purged from
+here at most every SESSION_CLEANUP_INTERVAL seconds per process, so no
+cron job is needed; `python manage.py clearsessions` does the same on demand.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends import db
+from django.db import DatabaseError
+
+
+DEFAULT_CLEANUP_INTERVAL = 3600   # seconds
+
+_lock = threading.Lock()
+_next_cleanup = 0.0
+
+
+def cleanup_due():
+    """True for the one caller that should purge expired sessions now."""
+    global _next_cleanup
+    now = time.monotonic()
+    with _lock:
+        if now < _next_cleanup:
+            return False
+        _next_cleanup = now + getattr(settings, 'SESSION_CLEANUP_INTERVAL', DEFAULT_CLEANUP_INTERVAL)
+        return True
+
+
+class SessionStore(db.SessionStore):
+    def save(self, must_create=False):
+        super().save(must_create=must_create)
+        if cleanup_due():
+            try:
+                self.clear_expired()
+            except DatabaseError:
+                pass   # busy: the next interval retries
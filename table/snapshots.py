@@ -0,0 +1,84 @@
+"""
+Consistent online copies of the SQLite database files.
+
+Copies go through sqlite3.Connection.backup, so they see committed data
+(including pages still in a WAL file) and never a half-written page.
+The copy runs a few pages at a time, and writers are only blocked for
+one step at a time.
+"""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+
+# Download name → database alias
+DATABASE_FILES = {
+    'real': 'real',
+    'example': 'default',
+}
+
+BACKUP_PAGES = 256       # pages copied per step
+BACKUP_SLEEP = 0.005     # seconds between steps (lets writers in)
+
+
+def database_path(alias):
+    return Path(settings.DATABASES[alias]['NAME'])
+
+
+def backup_into(source_path, dest_path, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP):
+    """Copy `source_path` into `dest_path` (created/overwritten) with the backup API."""
+    source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+    try:
+        dest = sqlite3.connect(dest_path)
+        try:
+            source.backup(dest, pages=pages, sleep=sleep)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+
+
+def snapshot_database(source_path, dest_path, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP):
+    """
+    Replace the contents of `dest_path` with a consistent copy of `source_path`.
+
+    The copy is first built in a temporary file (a few pages at a time, so
+    writers of the source are barely held up), then written into the
+    destination in a single backup step, i.e. one write transaction: readers
+    of `dest_path` see either the old database or the complete new one.
+    Swapping the file itself is only done when there is no destination yet;
+    under a WAL-mode database that would leave a stale -wal file behind.
+    """
+    dest_path = Path(dest_path)
+    fd, tmp_path = tempfile.mkstemp(dir=dest_path.parent, prefix=f'.{dest_path.name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        backup_into(source_path, tmp_path, pages=pages, sleep=sleep)
+        if dest_path.exists():
+            backup_into(tmp_path, dest_path, pages=-1)
+            os.unlink(tmp_path)
+        else:
+            os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def open_snapshot(source_path):
+    """
+    Return a readable binary file holding a consistent copy of `source_path`.
+    The temporary file is already unlinked and disappears when closed.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix='.sqlite3')
+    os.close(fd)
+    try:
+        backup_into(source_path, tmp_path)
+        snapshot = open(tmp_path, 'rb')
+    finally:
+        os.unlink(tmp_path)
+    return snapshot
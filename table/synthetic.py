@@ -0,0 +1,202 @@
+"""
+Synthetic curricula for benchmarks: same shape as the shipped RMUTK data,
+at any scale. Everything is written with bulk_create (no per-row saves).
+"""
+
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.db.models import Max
+
+from PLO_curriculumDsgn1.sqlite import readonly_uri
+
+from .aggregates import SEMESTERS
+from .models import (
+    Curriculum, CreditRow, Course, CoursePLO, KSECItem, CourseKSEC,
+    CLO, CLOKSEC, CLOSummary, parse_plo_tags,
+)
+
+
+GENERAL_GROUPS = ['Language', 'Social Sciences', 'Humanities', 'Science', 'Mathematics & Computer']
+CORE_GROUPS = ['Basic Science & Mathematics', 'Basic Engineering', 'Compulsory Professional Courses']
+KSEC_TYPES = ['K', 'S', 'E', 'C']
+# Cognitive levels and their scores (same as views_clo.bloom_scores)
+BLOOM_LEVELS = {'Remember': 1, 'Understand': 2, 'Apply': 3, 'Analyze': 4, 'Evaluate': 5, 'Create': 6}
+
+BATCH_SIZE = 500
+
+
+@contextmanager
+def temporary_sqlite_aliases(*aliases):
+    """
+    Point `aliases` at migrated, throw-away SQLite files for the duration of
+    the block. New aliases are registered; configured ones (e.g. 'default',
+    'real') are restored afterwards, so their real files are never touched.
+    Read-only mirrors of them (TEST MIRROR, e.g. 'example_ro') follow along.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix='plo-bench-'))
+    mirrors = {
+        alias: config['TEST']['MIRROR'] for alias, config in connections.settings.items()
+        if alias not in aliases and config.get('TEST', {}).get('MIRROR') in aliases
+    }
+    previous = {}
+    try:
+        for alias in [*aliases, *mirrors]:
+            if alias in connections.settings:
+                previous[alias] = connections.settings[alias]
+                connections[alias].close()
+                del connections[alias]
+            if alias in mirrors:
+                connections.settings[alias] = {
+                    **previous[alias], 'NAME': readonly_uri(workdir / f'{mirrors[alias]}.sqlite3'),
+                }
+            else:
+                base = previous.get(alias) or connections.settings['default']
+                connections.settings[alias] = {**base, 'NAME': workdir / f'{alias}.sqlite3'}
+        for alias in aliases:
+            call_command('migrate', database=alias, verbosity=0)
+        yield workdir
+    finally:
+        for alias in [*aliases, *mirrors]:
+            if alias in connections.settings:
+                connections[alias].close()
+                del connections[alias]
+            if alias in previous:
+                connections.settings[alias] = previous[alias]
+            else:
+                connections.settings.pop(alias, None)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def number_rows(objs, model, aliases):
+    """Give `objs` consecutive ids above every `model` row in `aliases` (no-op without aliases)."""
+    if aliases:
+        first = 1 + max(model.objects.using(alias).aggregate(last=Max('id'))['last'] or 0 for alias in aliases)
+        for row_id, obj in enumerate(objs, first):
+            obj.id = row_id
+    return objs
+
+
+def generate_curriculum(db, name='Synthetic curriculum', plos=13, courses_per_semester=8,
+                        clos_per_course=5, ksec_per_type=10, seed=0, curriculum_id=None,
+                        fresh_ids_in=()):
+    """
+    Create one curriculum in `db` and return it.
+
+    Every course gets a PLO, 1–3 KSEC codes per type, `clos_per_course` CLOs
+    (each mapped to one code per type) and a CLOSummary; all link tables are
+    filled as the app would fill them. With `fresh_ids_in`, every row gets an
+    id unused in `db` and in those aliases, so the curriculum can be copied
+    there without overwriting another one's rows.
+    """
+    rng = random.Random(seed)
+    aliases = [db, *fresh_ids_in] if fresh_ids_in else []
+
+    with transaction.atomic(using=db):
+        curriculum = Curriculum.objects.using(db).create(
+            id=curriculum_id, name=name, password='edit', clo_edit_password='clo'
+        )
+
+        # ---------- Credit rows ----------
+        rows = (
+            [CreditRow(curriculum=curriculum, name=n, row_type='general', sort_order=i + 1)
+             for i, n in enumerate(GENERAL_GROUPS)] +
+            [CreditRow(curriculum=curriculum, name=n, row_type='core', sort_order=i + 1)
+             for i, n in enumerate(CORE_GROUPS)] +
+            [CreditRow(curriculum=curriculum, name=f'PLO{i}: Synthetic learning outcome {i}', row_type='plo')
+             for i in range(1, plos + 1)] +
+            [CreditRow(curriculum=curriculum, name='Free Electives', row_type='free')]
+        )
+        rows = CreditRow.objects.using(db).bulk_create(number_rows(rows, CreditRow, aliases))
+        course_rows = [row for row in rows if row.row_type in ('general', 'core')]
+        plo_rows = [row for row in rows if row.row_type == 'plo']
+
+        # ---------- KSEC items ----------
+        items = KSECItem.objects.using(db).bulk_create(number_rows([
+            KSECItem(curriculum=curriculum, semester=0, type=typ,
+                     category_type='GE' if i % 2 == 0 else 'CE',
+                     description=f'Synthetic {typ} item {i + 1}', sort_order=i)
+            for typ in KSEC_TYPES
+            for i in range(ksec_per_type)
+        ], KSECItem, aliases), batch_size=BATCH_SIZE)
+        items_by_type = {typ: [item for item in items if item.type == typ] for typ in KSEC_TYPES}
+
+        # ---------- Courses ----------
+        courses = []
+        course_items = []
+        for sem in SEMESTERS:
+            for j in range(courses_per_semester):
+                selected = {
+                    typ: rng.sample(items_by_type[typ], min(len(items_by_type[typ]), rng.randint(1, 3)))
+                    for typ in KSEC_TYPES
+                }
+                courses.append(Course(
+                    curriculum=curriculum,
+                    credit_row=course_rows[(sem + j) % len(course_rows)],
+                    semester=sem,
+                    course_code=f'SYN-{sem}{j:04d}',
+                    course_name=f'Synthetic course {sem}.{j + 1}',
+                    credits=rng.choice([1, 2, 3, 3, 3, 4]),
+                    plo=f'PLO{rng.randint(1, plos)}:',
+                    description='',
+                    **{field: ', '.join(item.code for item in selected[typ])
+                       for typ, field in zip(KSEC_TYPES, Course.KSEC_FIELDS)},
+                ))
+                course_items.append(selected)
+        courses = Course.objects.using(db).bulk_create(number_rows(courses, Course, aliases), batch_size=BATCH_SIZE)
+
+        CoursePLO.objects.using(db).bulk_create(number_rows([
+            CoursePLO(curriculum=curriculum, course=course, plo=tag)
+            for course in courses for tag in parse_plo_tags(course.plo)
+        ], CoursePLO, aliases), batch_size=BATCH_SIZE)
+        CourseKSEC.objects.using(db).bulk_create(number_rows([
+            CourseKSEC(course=course, ksec_item=item)
+            for course, selected in zip(courses, course_items)
+            for typ in KSEC_TYPES for item in selected[typ]
+        ], CourseKSEC, aliases), batch_size=BATCH_SIZE)
+
+        # ---------- CLOs ----------
+        clos = []
+        clo_items = []
+        summaries = []
+        for course, selected in zip(courses, course_items):
+            levels = []
+            for index in range(1, clos_per_course + 1):
+                picks = {typ: rng.choice(selected[typ]) for typ in KSEC_TYPES}
+                level = rng.choice(list(BLOOM_LEVELS))
+                levels.append(BLOOM_LEVELS[level])
+                clos.append(CLO(
+                    course=course, index=index, clo=f'CLO{index}: Synthetic outcome {index}',
+                    bloom=level,
+                    **{field: picks[typ].code for typ, field in zip(KSEC_TYPES, CLO.KSEC_FIELDS)},
+                ))
+                clo_items.append(picks.values())
+            summaries.append(CLOSummary(course=course, bloom_score=max(levels, default=0)))
+
+        clos = CLO.objects.using(db).bulk_create(number_rows(clos, CLO, aliases), batch_size=BATCH_SIZE)
+        CLOKSEC.objects.using(db).bulk_create(number_rows([
+            CLOKSEC(clo=clo, ksec_item=item)
+            for clo, picks in zip(clos, clo_items) for item in picks
+        ], CLOKSEC, aliases), batch_size=BATCH_SIZE)
+        CLOSummary.objects.using(db).bulk_create(number_rows(summaries, CLOSummary, aliases), batch_size=BATCH_SIZE)
+
+        # ---------- Row credits follow the courses ----------
+        for row in course_rows + plo_rows:
+            for sem in SEMESTERS:
+                setattr(row, f'credits_sem{sem}', 0)
+        plo_by_tag = {parse_plo_tags(row.name)[0]: row for row in plo_rows}
+        for course in courses:
+            field = f'credits_sem{course.semester}'
+            for row in (course.credit_row, plo_by_tag.get(parse_plo_tags(course.plo)[0])):
+                if row is not None:
+                    setattr(row, field, getattr(row, field) + course.credits)
+        CreditRow.objects.using(db).bulk_update(
+            course_rows + plo_rows, [f'credits_sem{sem}' for sem in SEMESTERS]
+        )
+
+    return curriculum
@@ -54,6 +54,7 @@ urlpatterns = [
 
     # ✅ Synchronization and Backup/Restore
     path('sync-db/', admin_views.sync_real_to_example, name='sync_real_to_example'),
+    path('cache-stats/', admin_views.cache_stats, name='cache_stats'),
     path('curriculum/<int:curriculum_id>/backup/', 
          views.sync_curriculum_real_to_example, name='sync_curriculum_real_to_example'),
     path('curriculum/<int:curriculum_id>/restore/', 
@@ -1,18 +1,24 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Sum
 from .models import CreditRow, Course
 import re
 from django.contrib import messages  # 🔥 เพิ่มไว้ด้านบนด้วยนะครับ (import messages)
-from django.http import FileResponse, HttpResponse, HttpResponseNotFound
-import zipfile
-import os
-import io
+from django.http import FileResponse, HttpResponse, HttpResponseNotFound, StreamingHttpResponse
 from .models import Curriculum, CreditRow, Course, YLOPerPLOSemester, KSECItem
 from .models import CLO, CLOSummary  # ด้านบนของไฟล์ต้อง import ด้วย
+from .replication import replicate_curriculum
+from .journal import last_change_id, set_sync_cursor, sync_curriculum
+from django.db import DatabaseError
+from .snapshots import DATABASE_FILES, database_path, open_snapshot
+from .downloads import stream_zip, cached_snapshot, parse_range, iter_file_range
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .chart_cache import chart_cache, chart_key
+from .aggregates import CreditMatrix, SEMESTERS, plo_row_tag
+from .plo_summaries import refresh_plo_summaries
+from .ksec_cache import bump_ksec_version
+from .readonly import VIEW_DB
+from .write_queue import serialize_writes
 from django.http import HttpResponse
-import matplotlib.pyplot as plt
-import numpy as np
-from io import BytesIO
 
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import Curriculum
@@ -32,15 +38,15 @@ def curriculum_select(request):
 
         if not curriculum_id:
             return render(request, 'table/curriculum_select.html', {
-                'curriculums': Curriculum.objects.using('default').all(),
+                'curriculums': Curriculum.objects.using(VIEW_DB).all(),
                 'error_message': 'Please select a curriculum.',
             })
 
-        curriculum = get_object_or_404(Curriculum.objects.using('default'), pk=curriculum_id)
+        curriculum = get_object_or_404(Curriculum.objects.using(VIEW_DB), pk=curriculum_id)
 
         if mode == 'edit' and password != curriculum.password:
             return render(request, 'table/curriculum_select.html', {
-                'curriculums': Curriculum.objects.using('default').all(),
+                'curriculums': Curriculum.objects.using(VIEW_DB).all(),
                 'error_message': 'Incorrect password.',
             })
 
@@ -48,13 +54,14 @@ def curriculum_select(request):
         return redirect('credit_table', curriculum_id=curriculum.id)
 
     return render(request, 'table/curriculum_select.html', {
-        'curriculums': Curriculum.objects.using('default').all()
+        'curriculums': Curriculum.objects.using(VIEW_DB).all()
     })
 
 
+@serialize_writes
 def credit_table(request, curriculum_id):
     mode = request.session.get('access_mode', 'view')  # 'view' or 'edit'
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     curriculum = get_object_or_404(Curriculum.objects.using(db), pk=curriculum_id)
 
@@ -152,6 +159,8 @@ def credit_table(request, curriculum_id):
         from .views_ylo import update_ylo_for_curriculum
         update_ylo_for_curriculum(curriculum)
         sync_plo_credits_to_creditrow(curriculum)
+        # PLO rows may be renamed/added/removed → rebuild every PLO summary
+        refresh_plo_summaries('real', curriculum.id)
 
         # Free Electives row name (English)
         free_name = 'Free Electives'
@@ -165,54 +174,23 @@ def credit_table(request, curriculum_id):
 
         return redirect('credit_table', curriculum_id=curriculum.id)
 
-    all_rows = CreditRow.objects.using(db).filter(curriculum=curriculum)
+    # one CreditRow query + one grouped Course query for the whole table
+    matrix = CreditMatrix(curriculum.id, db)
 
     general_rows = [
         (row.id, row.name, row.credit_list(), row.total_credits(), row.sort_order)
-        for row in all_rows.filter(row_type='general').order_by('sort_order', 'id')
+        for row in matrix.rows_of('general')
     ]
     core_rows = [
         (row.id, row.name, row.credit_list(), row.total_credits(), row.sort_order)
-        for row in all_rows.filter(row_type='core').order_by('sort_order', 'id')
+        for row in matrix.rows_of('core')
     ]
-    plo_rows = [(row.id, row.name, row.credit_list(), row.total_credits()) for row in all_rows.filter(row_type='plo').order_by('id')]
-    free_elective = all_rows.filter(row_type='free').first()
+    plo_rows = [(row.id, row.name, row.credit_list(), row.total_credits()) for row in matrix.plo_rows]
+    free_rows = matrix.rows_of('free')
+    free_elective = free_rows[0] if free_rows else None
     free_elective_tuple = (free_elective.name, free_elective.credit_list(), free_elective.total_credits()) if free_elective else None
     has_saved = request.method == 'POST'
 
-    # compute totals per (PLO row, semester) based on courses
-    plo_course_totals = {}
-    for row in all_rows.filter(row_type='plo'):
-        if row.name:
-            plo_tag = row.name.split()[0]  # e.g., "PLO1:" or "PLO1"
-            for semester in range(1, 9):
-                general_core_sum = Course.objects.using(db).filter(
-                    curriculum=curriculum,
-                    semester=semester,
-                    plo=plo_tag,
-                    credit_row__row_type__in=['general', 'core']
-                ).aggregate(Sum('credits'))['credits__sum'] or 0
-                free_sum = Course.objects.using(db).filter(
-                    curriculum=curriculum,
-                    semester=semester,
-                    plo=plo_tag,
-                    category='free_elective'
-                ).aggregate(Sum('credits'))['credits__sum'] or 0
-                key = f"{row.id}_{semester}"
-                plo_course_totals[key] = general_core_sum + free_sum
-
-    # semester totals for all PLOs
-    plo_semester_totals = {i: 0 for i in range(1, 9)}
-    for key, value in plo_course_totals.items():
-        _, semester = key.split('_')
-        plo_semester_totals[int(semester)] += value
-
-    total_credits_all = sum(row.total_credits() for row in all_rows)
-    plo_percentages = {
-        str(row.id): round((row.total_credits() / total_credits_all) * 100, 2) if total_credits_all else 0
-        for row in all_rows.filter(row_type='plo')
-    }
-
     return render(request, 'table/credit_table.html', {
         'curriculum': curriculum,
         'headers': headers,
@@ -221,16 +199,17 @@ def credit_table(request, curriculum_id):
         'plo_rows': plo_rows,
         'free_elective': free_elective_tuple,
         'has_saved': has_saved,
-        'plo_course_totals': plo_course_totals,
-        'plo_semester_totals': plo_semester_totals,
-        'plo_percentages': plo_percentages,
+        'plo_course_totals': matrix.plo_course_totals,
+        'plo_semester_totals': matrix.plo_semester_totals,
+        'plo_percentages': matrix.plo_percentages,
         'access_mode': mode,
     })
 
 
+@serialize_writes
 def reset_credit_table(request, curriculum_id):
     mode = request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     if mode != 'edit':
         return redirect('credit_table', curriculum_id=curriculum_id)
@@ -247,6 +226,7 @@ def reset_credit_table(request, curriculum_id):
         YLOPerPLOSemester.objects.using(db).filter(curriculum=curriculum).delete()
         # delete KSEC items
         KSECItem.objects.using(db).filter(curriculum=curriculum).delete()
+        bump_ksec_version(db, curriculum.id)
         # delete CreditRows
         CreditRow.objects.using(db).filter(curriculum=curriculum).delete()
         # do not delete Curriculum itself
@@ -303,275 +283,110 @@ def reset_credit_table(request, curriculum_id):
 
         return redirect('credit_table', curriculum_id=curriculum.id)
     
+@serialize_writes
 def sync_curriculum_real_to_example(request, curriculum_id):
     if request.session.get('access_mode') != 'edit':
         messages.error(request, "🚫 You must be in Edit mode to back up data.")
         return redirect('credit_table', curriculum_id=curriculum_id)
 
-    curriculum_real = Curriculum.objects.using('real').filter(id=curriculum_id).first()
-    if not curriculum_real:
+    if not Curriculum.objects.using('real').filter(id=curriculum_id).exists():
         messages.error(request, f"❌ Curriculum ID={curriculum_id} not found in the 'real' database.")
         return redirect('credit_table', curriculum_id=curriculum_id)
 
-    # wipe children in example
-    CreditRow.objects.using('default').filter(curriculum_id=curriculum_id).delete()
-    Course.objects.using('default').filter(curriculum_id=curriculum_id).delete()
-    YLOPerPLOSemester.objects.using('default').filter(curriculum_id=curriculum_id).delete()
-    KSECItem.objects.using('default').filter(curriculum_id=curriculum_id).delete()
-    CLO.objects.using('default').filter(course__curriculum_id=curriculum_id).delete()
-    CLOSummary.objects.using('default').filter(course__curriculum_id=curriculum_id).delete()
-
-    # copy/update Curriculum (no delete)
-    Curriculum.objects.using('default').update_or_create(
-        id=curriculum_real.id,
-        defaults={
-            'name': curriculum_real.name,
-            'password': curriculum_real.password,
-            'clo_edit_password': curriculum_real.clo_edit_password
-        }
-    )
-
-    # copy CreditRow
-    real_to_default_creditrow = {}
-    for row in CreditRow.objects.using('real').filter(curriculum_id=curriculum_id):
-        new_row = CreditRow.objects.using('default').create(
-            curriculum_id=row.curriculum_id,
-            name=row.name,
-            row_type=row.row_type,
-            credits_sem1=row.credits_sem1,
-            credits_sem2=row.credits_sem2,
-            credits_sem3=row.credits_sem3,
-            credits_sem4=row.credits_sem4,
-            credits_sem5=row.credits_sem5,
-            credits_sem6=row.credits_sem6,
-            credits_sem7=row.credits_sem7,
-            credits_sem8=row.credits_sem8,
-            sort_order=row.sort_order,  # ✅ add this line
-        )
-        real_to_default_creditrow[row.id] = new_row
-
-    # copy Course with same IDs
-    real_to_default_course = {}
-    for course in Course.objects.using('real').filter(curriculum_id=curriculum_id):
-        new_credit_row = real_to_default_creditrow.get(course.credit_row.id) if course.credit_row else None
-
-        new_course = Course(
-            id=course.id,
-            curriculum_id=course.curriculum_id,
-            course_code=course.course_code,
-            course_name=course.course_name,
-            credits=course.credits,
-            semester=course.semester,
-            plo=course.plo,
-            category=course.category,
-            credit_row=new_credit_row,
-            knowledge=course.knowledge,
-            skills=course.skills,
-            ethics=course.ethics,
-            character=course.character,
-            description=course.description
-        )
-        new_course.save(using='default', force_insert=True)
-        real_to_default_course[course.id] = new_course
-
-    # copy YLOPerPLOSemester
-    for ylo in YLOPerPLOSemester.objects.using('real').filter(curriculum_id=curriculum_id):
-        YLOPerPLOSemester.objects.using('default').create(
-            curriculum_id=ylo.curriculum_id,
-            plo=ylo.plo,
-            semester=ylo.semester,
-            summary_text=ylo.summary_text
-        )
-
-    # copy KSECItem
-    for item in KSECItem.objects.using('real').filter(curriculum_id=curriculum_id):
-        KSECItem.objects.using('default').create(
-            curriculum_id=item.curriculum_id,
-            semester=0,
-            type=item.type,
-            category_type=item.category_type,
-            description=item.description,
-            sort_order=item.sort_order
-        )
+    try:
+        # ✅ replays only the rows changed since the last backup (full copy the first time)
+        counts, incremental = sync_curriculum(curriculum_id, source='real', target='default')
+    except DatabaseError as e:
+        messages.error(request, f"❌ Backup failed, the example database was left unchanged: {e}")
+        return redirect('credit_table', curriculum_id=curriculum_id)
 
-    # copy CLO & CLOSummary
-    for course in Course.objects.using('real').filter(curriculum_id=curriculum_id):
-        new_course = real_to_default_course.get(course.id)
-        if not new_course:
-            continue
-
-        for clo in CLO.objects.using('real').filter(course=course):
-            CLO.objects.using('default').create(
-                course=new_course,
-                index=clo.index,
-                clo=clo.clo,
-                bloom=clo.bloom,
-                k=clo.k,
-                s=clo.s,
-                e=clo.e,
-                c=clo.c
-            )
-
-        summary = CLOSummary.objects.using('real').filter(course=course).first()
-        if summary:
-            CLOSummary.objects.using('default').create(
-                course=new_course,
-                bloom_score=summary.bloom_score,
-                k_percent=summary.k_percent,
-                s_percent=summary.s_percent,
-                e_percent=summary.e_percent,
-                c_percent=summary.c_percent
-            )
-
-    messages.success(request, "✅ Curriculum backed up to the example database.")
+    if incremental:
+        messages.success(request, f"✅ Curriculum backed up to the example database ({sum(counts.values())} changed rows).")
+    else:
+        messages.success(request, "✅ Curriculum backed up to the example database.")
     return redirect('credit_table', curriculum_id=curriculum_id)
 
 
+@serialize_writes
 def sync_curriculum_example_to_real(request, curriculum_id):
     if request.session.get('access_mode') != 'edit':
         messages.error(request, "🚫 You must be in Edit mode to restore data.")
         return redirect('credit_table', curriculum_id=curriculum_id)
 
-    curriculum_example = get_object_or_404(Curriculum.objects.using('default'), id=curriculum_id)
-
-    # wipe old in real
-    CLO.objects.using('real').filter(course__curriculum_id=curriculum_id).delete()
-    CLOSummary.objects.using('real').filter(course__curriculum_id=curriculum_id).delete()
-    CreditRow.objects.using('real').filter(curriculum_id=curriculum_id).delete()
-    Course.objects.using('real').filter(curriculum_id=curriculum_id).delete()
-    YLOPerPLOSemester.objects.using('real').filter(curriculum_id=curriculum_id).delete()
-    KSECItem.objects.using('real').filter(curriculum_id=curriculum_id).delete()
-    Curriculum.objects.using('real').filter(id=curriculum_id).delete()
-
-    # copy Curriculum
-    Curriculum.objects.using('real').create(
-        id=curriculum_example.id,
-        name=curriculum_example.name,
-        password=curriculum_example.password,
-        clo_edit_password=curriculum_example.clo_edit_password
-    )
-
-    # copy CreditRow (same IDs)
-    example_to_real_creditrow = {}
-    for row in CreditRow.objects.using('default').filter(curriculum_id=curriculum_id):
-        new_row = CreditRow.objects.using('real').create(
-            id=row.id,
-            curriculum_id=row.curriculum_id,
-            name=row.name,
-            row_type=row.row_type,
-            credits_sem1=row.credits_sem1,
-            credits_sem2=row.credits_sem2,
-            credits_sem3=row.credits_sem3,
-            credits_sem4=row.credits_sem4,
-            credits_sem5=row.credits_sem5,
-            credits_sem6=row.credits_sem6,
-            credits_sem7=row.credits_sem7,
-            credits_sem8=row.credits_sem8,
-            sort_order=row.sort_order,  # ✅ add this line
-        )
-        example_to_real_creditrow[row.id] = new_row
-
-    # copy Course (same IDs)
-    example_to_real_course = {}
-    for course in Course.objects.using('default').filter(curriculum_id=curriculum_id):
-        new_credit_row = example_to_real_creditrow.get(course.credit_row.id) if course.credit_row else None
-
-        new_course = Course(
-            id=course.id,
-            curriculum_id=course.curriculum_id,
-            course_code=course.course_code,
-            course_name=course.course_name,
-            credits=course.credits,
-            semester=course.semester,
-            plo=course.plo,
-            category=course.category,
-            credit_row=new_credit_row,
-            knowledge=course.knowledge,
-            skills=course.skills,
-            ethics=course.ethics,
-            character=course.character,
-            description=course.description
-        )
-        new_course.save(using='real', force_insert=True)
-        example_to_real_course[course.id] = new_course
-
-    # copy YLOPerPLOSemester
-    for ylo in YLOPerPLOSemester.objects.using('default').filter(curriculum_id=curriculum_id):
-        YLOPerPLOSemester.objects.using('real').create(
-            curriculum_id=ylo.curriculum_id,
-            plo=ylo.plo,
-            semester=ylo.semester,
-            summary_text=ylo.summary_text
-        )
+    get_object_or_404(Curriculum.objects.using('default'), id=curriculum_id)
 
-    # copy KSECItem
-    for item in KSECItem.objects.using('default').filter(curriculum_id=curriculum_id):
-        KSECItem.objects.using('real').create(
-            curriculum_id=item.curriculum_id,
-            semester=0,
-            type=item.type,
-            category_type=item.category_type,
-            description=item.description,
-            sort_order=item.sort_order
-        )
-
-    # copy CLO & CLOSummary
-    for course in Course.objects.using('default').filter(curriculum_id=curriculum_id):
-        new_course = example_to_real_course.get(course.id)
-        if not new_course:
-            continue
-
-        for clo in CLO.objects.using('default').filter(course=course):
-            CLO.objects.using('real').create(
-                course=new_course,
-                index=clo.index,
-                clo=clo.clo,
-                bloom=clo.bloom,
-                k=clo.k,
-                s=clo.s,
-                e=clo.e,
-                c=clo.c
-            )
-
-        summary = CLOSummary.objects.using('default').filter(course=course).first()
-        if summary:
-            CLOSummary.objects.using('real').create(
-                course=new_course,
-                bloom_score=summary.bloom_score,
-                k_percent=summary.k_percent,
-                s_percent=summary.s_percent,
-                e_percent=summary.e_percent,
-                c_percent=summary.c_percent
-            )
+    try:
+        through = last_change_id('real')
+        replicate_curriculum(curriculum_id, source='default', target='real')
+        # example now matches real up to `through`; the restore's own journal entries replay harmlessly
+        set_sync_cursor('default', curriculum_id, through)
+    except DatabaseError as e:
+        messages.error(request, f"❌ Restore failed, the main database was left unchanged: {e}")
+        return redirect('credit_table', curriculum_id=curriculum_id)
 
     messages.success(request, "✅ Restored from example database to the main database (overwrote old data).")
     return redirect('credit_table', curriculum_id=curriculum_id)
 
 
 def download_all_databases(request):
-    filenames = ['real.sqlite3', 'example.sqlite3']
-    missing_files = [f for f in filenames if not os.path.exists(f)]
+    filenames = {name: database_path(alias) for name, alias in DATABASE_FILES.items()}
+    missing_files = [path.name for path in filenames.values() if not path.exists()]
 
     if missing_files:
         return HttpResponseNotFound(f"Missing files: {', '.join(missing_files)}")
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-        for filename in filenames:
-            zip_file.write(filename)
-
-    zip_buffer.seek(0)
-    return FileResponse(zip_buffer, as_attachment=True, filename='all_databases.zip')
+    # stream a deflated zip of consistent snapshots (not the live files that may be mid-write)
+    response = StreamingHttpResponse(
+        stream_zip([
+            (f'{name}.sqlite3', lambda path=path: open_snapshot(path))
+            for name, path in filenames.items()
+        ]),
+        content_type='application/zip',
+    )
+    response['Content-Disposition'] = 'attachment; filename="all_databases.zip"'
+    return response
 
 def download_database(request, db_name):
-    if db_name not in ['real', 'example']:
+    if db_name not in DATABASE_FILES:
         return HttpResponse("Invalid database name", status=400)
 
-    file_path = f'{db_name}.sqlite3'
-    if not os.path.exists(file_path):
+    file_path = database_path(DATABASE_FILES[db_name])
+    if not file_path.exists():
         return HttpResponse("File not found", status=404)
 
-    return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=f'{db_name}.sqlite3')
+    # ✅ snapshot + content hash are cached until the live file changes
+    etag, snapshot, last_modified = cached_snapshot(file_path)
+    last_modified = int(last_modified)
+
+    # If-None-Match / If-Modified-Since → 304, If-Match → 412
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    size = snapshot.stat().st_size
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and (if_range is None or if_range in (etag, http_date(last_modified))):
+        byte_range = parse_range(request.headers['Range'], size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            iter_file_range(snapshot, start, end), status=206, content_type='application/octet-stream'
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+        response['Content-Disposition'] = f'attachment; filename="{db_name}.sqlite3"'
+    else:
+        response = FileResponse(open(snapshot, 'rb'), as_attachment=True, filename=f'{db_name}.sqlite3')
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
 
 def extract_plo_tag(name):
     """
@@ -585,26 +400,17 @@ def extract_plo_tag(name):
 
 def sync_plo_credits_to_creditrow(curriculum):
     # update only in real (edit mode)
-    plo_rows = CreditRow.objects.using('real').filter(curriculum=curriculum, row_type='plo')
+    matrix = CreditMatrix(curriculum.id, 'real')
 
-    for row in plo_rows:
-        # ✅ ใช้ extract_plo_tag() ที่เราสร้างไว้ตอนต้น
-        plo_tag = extract_plo_tag(row.name)
-
-        # ✅ ใช้ regex แบบ boundary ป้องกัน PLO1 จับ PLO10–13
-        pattern = rf'(^|[ ,;:]){re.escape(plo_tag)}([ ,;:]|$)'
+    for row in matrix.plo_rows:
+        # ✅ PLO1 ไม่ปนกับ PLO10–13 เพราะเทียบ tag ที่ normalize แล้วใน CoursePLO
+        plo_tag = plo_row_tag(row)
+        for sem in SEMESTERS:
+            setattr(row, f'credits_sem{sem}', matrix.course_credits(plo_tag, sem))
 
-        new_credits = []
-        for sem in range(1, 9):
-            total = Course.objects.using('real').filter(
-                curriculum=curriculum,
-                semester=sem
-            ).filter(plo__iregex=pattern).aggregate(Sum('credits'))['credits__sum'] or 0
-            new_credits.append(total)
-
-        for i, val in enumerate(new_credits):
-            setattr(row, f'credits_sem{i+1}', val)
-        row.save(using='real')
+    CreditRow.objects.using('real').bulk_update(
+        matrix.plo_rows, [f'credits_sem{sem}' for sem in SEMESTERS]
+    )
 
 
 def debug_print_plo_credits(curriculum):
@@ -618,59 +424,33 @@ def debug_print_plo_credits(curriculum):
 
 def plo_graph_from_creditrow(request, curriculum_id):
     mode = request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     # Get PLO rows
-    plo_rows = CreditRow.objects.using(db).filter(curriculum_id=curriculum_id, row_type='plo').order_by('id')
+    matrix = CreditMatrix(curriculum_id, db)
     plo_labels = []
     plo_values = []
-    for row in plo_rows:
-        tag = extract_plo_tag(row.name)
-        plo_labels.append(tag)
-        plo_values.append([
-            row.credits_sem1, row.credits_sem2, row.credits_sem3, row.credits_sem4,
-            row.credits_sem5, row.credits_sem6, row.credits_sem7, row.credits_sem8,
-        ])
-
-    # Handle no data
-    if len(plo_labels) == 0:
-        plt.figure(figsize=(10, 5))
-        plt.axis('off')
-        plt.text(0.5, 0.5, 'No PLO data available for graph', fontsize=28, color='red',
-                 ha='center', va='center', transform=plt.gca().transAxes)
-        buf = BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close()
-        buf.seek(0)
-        return HttpResponse(buf.getvalue(), content_type='image/png')
-
-    # Prepare year sums
-    plo_values = np.array(plo_values).T   # shape: (8, n_plo)
-    year_labels = ['Year 1', 'Year 2', 'Year 3', 'Year 4']
-    year_data = [
-        plo_values[0] + plo_values[1],   # Year 1
-        plo_values[2] + plo_values[3],   # Year 2
-        plo_values[4] + plo_values[5],   # Year 3
-        plo_values[6] + plo_values[7],   # Year 4
-    ]
-
-    ind = np.arange(len(plo_labels))
-    bottom = np.zeros(len(plo_labels))
-    colors = ['#43a047', '#1976d2', '#fbc02d', '#d81b60']
-
-    plt.figure(figsize=(12, 5))
-    for i in range(4):
-        plt.bar(ind, year_data[i], bottom=bottom, label=year_labels[i], color=colors[i])
-        bottom += year_data[i]
-    plt.xticks(ind, plo_labels)
-    plt.xlabel('PLO')
-    plt.ylabel('Total Credits')
-    plt.title('PLO Credit Distribution by Year (Stacked Bar)')
-    plt.legend(title="Year")
-    plt.tight_layout()
-
-    buf = BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    return HttpResponse(buf.getvalue(), content_type='image/png')
+    for row in matrix.plo_rows:
+        plo_labels.append(extract_plo_tag(row.name))
+        plo_values.append(row.credit_list())
+
+    # ✅ Same labels + credits → same image: ETag is the data hash, PNG comes from the LRU cache
+    key = chart_key(plo_labels, plo_values)
+    etag = f'"{key}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
+
+    # charting module is loaded on first use only (keeps worker boot light)
+    from . import charts
+    try:
+        png = chart_cache.get_or_render(key, lambda: charts.render_plo_graph(plo_labels, plo_values))
+    except charts.ChartRenderError as e:
+        response = HttpResponse(str(e), status=503, content_type='text/plain')
+        response['Retry-After'] = 5
+        return response
+
+    response = HttpResponse(png, content_type='image/png')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'   # browser keeps it but revalidates (data may change)
+    return response
@@ -1,8 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponseNotFound
 from django.contrib import messages
-from .models import Curriculum, Course, KSECItem, CLO, CLOSummary, CreditRow
-from table.views import sync_curriculum_real_to_example  # import for syncing
+from django.db import DatabaseError, transaction
+from django.db.models import Count
+from .models import Curriculum, Course, CLO, CLOSummary, CourseKSEC, CLOKSEC, ksec_code_map, parse_ksec_codes
+from .drift import CourseResyncError, course_digest, resync_course
+from .plo_summaries import course_plo_tags, refresh_plo_summaries
+from .ksec_cache import ksec_dictionary
+from .readonly import VIEW_DB
+from .write_queue import serialize_writes
 import re
 
 
@@ -10,28 +16,40 @@ import re
 def get_db_alias(request):
     # Support both query string (?mode=edit) and session
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
-    return 'real' if mode == 'edit' else 'default'
+    return 'real' if mode == 'edit' else VIEW_DB
+
+
+# ✅ Build {type: [(code, description), ...]} from the course's KSEC links + cached KSEC dictionary
+def get_course_ksec_items(course, db, version=None):
+    ksec = ksec_dictionary(db, course.curriculum_id, version)
+    item_ids = CourseKSEC.objects.using(db).filter(course=course).values_list('ksec_item_id', flat=True)
+
+    items = {'K': [], 'S': [], 'E': [], 'C': []}
+    for item in ksec.ordered(item_ids):
+        items[item.type].append((item.code, item.description.strip()))
+    return items
+
+
+# ✅ K/S/E/C coverage of saved CLOs (distinct linked items ÷ course items), via link tables
+def get_ksec_coverage(db, course_id):
+    course_items = CourseKSEC.objects.using(db).filter(course_id=course_id)
+    totals = dict(
+        course_items.values('ksec_item__type').annotate(n=Count('id')).values_list('ksec_item__type', 'n')
+    )
+    selected = dict(
+        CLOKSEC.objects.using(db).filter(
+            clo__course_id=course_id,
+            ksec_item__in=course_items.values('ksec_item'),
+        ).values('ksec_item__type').annotate(
+            n=Count('ksec_item', distinct=True)
+        ).values_list('ksec_item__type', 'n')
+    )
 
-
-# ✅ Parse comma-separated KSEC codes into a list (trim + remove inner spaces)
-def parse_ksec_list(text):
-    return [item.strip().replace(" ", "") for item in text.split(',')] if text else []
-
-
-# ✅ Build (code, description) list from KSECItem for the given type
-def get_ksec_map(curriculum, db, ksec_list, ksec_type):
-    ksec_items = KSECItem.objects.using(db).filter(
-        curriculum=curriculum, type=ksec_type, semester=0
-    ).order_by('category_type', 'sort_order')
-
-    # Codes are GE(K)1, CE(S)3, etc. (sort_order is 0-based → add 1)
-    ksec_lookup = {
-        f"{item.category_type}({item.type}){item.sort_order + 1}".replace(" ", ""): item.description.strip()
-        for item in ksec_items
+    return {
+        f'{typ.lower()}_percent': round(selected.get(typ, 0) / totals[typ] * 100, 2) if totals.get(typ) else 0
+        for typ in ('K', 'S', 'E', 'C')
     }
 
-    return [(code, ksec_lookup.get(code.replace(" ", ""), '')) for code in ksec_list]
-
 
 # ✅ Remove leading prefix like "CLO1:", "CLO 2 :" from text
 def strip_clo_prefix(text):
@@ -98,17 +116,17 @@ def compute_ksec_percent(clo_list, ksec_items):
         return set(code for code, _ in items)
 
     def get_selected_codes(clo_list, key):
-        return set(clo[key].strip() for clo in clo_list if clo.get(key, '').strip())
+        return set(clo[key].strip() for clo in clo_list if (clo.get(key) or '').strip())
 
     k_all = get_total_codes(ksec_items['K'])
     s_all = get_total_codes(ksec_items['S'])
     e_all = get_total_codes(ksec_items['E'])
     c_all = get_total_codes(ksec_items['C'])
 
-    k_sel = get_selected_codes(clo_list, 'k')
-    s_sel = get_selected_codes(clo_list, 's')
-    e_sel = get_selected_codes(clo_list, 'e')
-    c_sel = get_selected_codes(clo_list, 'c')
+    k_sel = get_selected_codes(clo_list, 'k') & k_all
+    s_sel = get_selected_codes(clo_list, 's') & s_all
+    e_sel = get_selected_codes(clo_list, 'e') & e_all
+    c_sel = get_selected_codes(clo_list, 'c') & c_all
 
     return {
         'k_percent': round(len(k_sel) / len(k_all) * 100, 2) if k_all else 0,
@@ -139,10 +157,9 @@ def clo_ksec_map(request, curriculum_id, course_id):
         request.session.pop('session_saved_flag', None)
 
     # Build selectable K/S/E/C maps based on current course selections
-    k_items = get_ksec_map(curriculum, db, parse_ksec_list(course.knowledge), 'K')
-    s_items = get_ksec_map(curriculum, db, parse_ksec_list(course.skills), 'S')
-    e_items = get_ksec_map(curriculum, db, parse_ksec_list(course.ethics), 'E')
-    c_items = get_ksec_map(curriculum, db, parse_ksec_list(course.character), 'C')
+    ksec_items = get_course_ksec_items(course, db, curriculum.ksec_version)
+    k_items, s_items, e_items, c_items = (ksec_items[t] for t in ('K', 'S', 'E', 'C'))
+    percentages = None
 
     # Determine data source: session (if present in readonly) or DB
     if readonly and session_saved:
@@ -166,17 +183,17 @@ def clo_ksec_map(request, curriculum_id, course_id):
             for clo in clo_objs
         ]
         course_description = course.description or ""
+        percentages = get_ksec_coverage(db, course.id)
 
         # Clear any stale session data in edit mode
         if not readonly:
             request.session.pop(session_clo_key, None)
             request.session.pop(session_desc_key, None)
 
-    # Compute Bloom score and KSEC coverage
+    # Compute Bloom score and KSEC coverage (session drafts are not linked yet)
     final_bloom_score = get_final_bloom_score(clo_list)
-    percentages = compute_ksec_percent(clo_list, {
-        'K': k_items, 'S': s_items, 'E': e_items, 'C': c_items
-    })
+    if percentages is None:
+        percentages = compute_ksec_percent(clo_list, ksec_items)
 
     return render(request, 'table/clo_ksec_map.html', {
         'curriculum': curriculum,
@@ -196,112 +213,104 @@ def clo_ksec_map(request, curriculum_id, course_id):
 
 
 # ✅ Persist CLOs + summary (save to both real and example DBs), including course.description
+@serialize_writes
 def save_clo_ksec_map(request, curriculum_id, course_id):
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
 
-    need_sync = should_sync_course(course_id)
-    if need_sync:
-        print("SYNC IS NEEDED!")
+    if request.method != 'POST':
+        return HttpResponseNotFound("⛔ Invalid method")
+
+    get_object_or_404(Course.objects.using('real'), id=course_id, curriculum_id=curriculum_id)
+
+    # ✅ Only this course has to match in both DBs (course row, CLOs, KSEC links, summary)
+    if course_digest('real', course_id) != course_digest('default', course_id):
+        synced = False
         if mode == 'edit':
-            sync_curriculum_real_to_example(request, curriculum_id)
-        else:
+            try:
+                resync_course(course_id, 'real', 'default')
+                synced = True
+            except CourseResyncError:
+                pass   # the course or its KSEC items are missing there: needs a backup
+        if not synced:
             messages.error(
                 request,
                 "⚠️ Example DB is out of sync with Real DB. Please sync Real → Example before saving."
             )
             return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
-    else:
-        print("NO SYNC NEEDED")
 
-    if request.method != 'POST':
-        return HttpResponseNotFound("⛔ Invalid method")
-
-    # Load curriculum & course in both DBs
-    curriculum_real = get_object_or_404(Curriculum.objects.using('real'), id=curriculum_id)
-    curriculum_default = get_object_or_404(Curriculum.objects.using('default'), id=curriculum_id)
-    course_real = get_object_or_404(Course.objects.using('real'), id=course_id, curriculum=curriculum_real)
+    # Course must exist in both DBs
+    get_object_or_404(Course.objects.using('default'), id=course_id, curriculum_id=curriculum_id)
 
-    # Prepare inputs
+    # Parse the form once, then write both DBs in one go
+    clo_list = build_clo_list_from_post(request)
     course_description = request.POST.get('course_description', '').strip()
-    total = len(request.POST.getlist('clo[]'))
-    clo_list = []
 
-    # Remove existing CLOs and CLOSummary in both DBs
-    for db in ['real', 'default']:
-        CLO.objects.using(db).filter(course_id=course_id).delete()
-        CLOSummary.objects.using(db).filter(course_id=course_id).delete()
+    try:
+        write_course_clos(curriculum_id, course_id, clo_list, course_description)
+    except DatabaseError as e:
+        messages.error(request, f"❌ Save failed, nothing was changed: {e}")
+        return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
 
-    # Recreate CLOs
-    for i in range(total):
-        clo_text = strip_clo_prefix(request.POST.getlist('clo[]')[i])
-        clo_data = {
-            'bloom': request.POST.getlist('bloom[]')[i],
-            'k': request.POST.getlist('k[]')[i],
-            's': request.POST.getlist('s[]')[i],
-            'e': request.POST.getlist('e[]')[i],
-            'c': request.POST.getlist('c[]')[i],
-        }
-        clo_full_text = f"CLO{i+1}: {clo_text}"
-        clo_list.append({'index': i+1, 'clo': clo_full_text, **clo_data})
+    messages.success(request, "✅ Saved CLO–KSEC successfully (Real + Example).")
+    return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
 
-        for db in ['real', 'default']:
-            CLO.objects.using(db).create(
-                course_id=course_id,
-                index=i+1,
-                clo=clo_full_text,
-                bloom=clo_data['bloom'],
-                k=clo_data['k'],
-                s=clo_data['s'],
-                e=clo_data['e'],
-                c=clo_data['c']
-            )
 
-    # Recompute summaries
-    k_items = get_ksec_map(curriculum_real, 'real', parse_ksec_list(course_real.knowledge), 'K')
-    s_items = get_ksec_map(curriculum_real, 'real', parse_ksec_list(course_real.skills), 'S')
-    e_items = get_ksec_map(curriculum_real, 'real', parse_ksec_list(course_real.ethics), 'E')
-    c_items = get_ksec_map(curriculum_real, 'real', parse_ksec_list(course_real.character), 'C')
+# ✅ Reset all CLOs (and description) in both DBs
+@serialize_writes
+def reset_clo_ksec_map(request, curriculum_id, course_id):
+    get_object_or_404(Course.objects.using('real'), id=course_id, curriculum_id=curriculum_id)
+    get_object_or_404(Course.objects.using('default'), id=course_id, curriculum_id=curriculum_id)
 
-    bloom_score = get_final_bloom_score(clo_list)
-    percents = compute_ksec_percent(clo_list, {
-        'K': k_items, 'S': s_items, 'E': e_items, 'C': c_items
-    })
+    try:
+        write_course_clos(curriculum_id, course_id, [], "", with_summary=False)
+    except DatabaseError as e:
+        messages.error(request, f"❌ Reset failed, nothing was changed: {e}")
+        return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
 
-    for db in ['real', 'default']:
-        CLOSummary.objects.using(db).create(
-            course_id=course_id,
-            bloom_score=bloom_score,
-            k_percent=percents['k_percent'],
-            s_percent=percents['s_percent'],
-            e_percent=percents['e_percent'],
-            c_percent=percents['c_percent'],
-        )
+    messages.success(request, "♻️ Reset CLO–KSEC completed (Real + Example).")
+    return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
 
-    # Save description in both DBs
-    course_real.description = course_description
-    course_real.save(using='real')
 
-    course_default = get_object_or_404(Course.objects.using('default'), id=course_id, curriculum=curriculum_default)
-    course_default.description = course_description
-    course_default.save(using='default')
+# ✅ Replace a course's CLOs, CLO→KSEC links, summary and description in every DB.
+# One atomic block per DB, nested: an error anywhere rolls back both sides.
+# Each DB numbers its own CLOs and links them to its own KSEC item ids (by code);
+# the next backup realigns Example's ids with Real's (table.journal).
+CLO_DATABASES = ['real', 'default']
 
-    messages.success(request, "✅ Saved CLO–KSEC successfully (Real + Example).")
-    return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
+def write_course_clos(curriculum_id, course_id, clo_list, course_description, with_summary=True):
+    bloom_score = get_final_bloom_score(clo_list)
+    percents = None
 
+    with transaction.atomic(using=CLO_DATABASES[0]), transaction.atomic(using=CLO_DATABASES[1]):
+        for db in CLO_DATABASES:
+            CLO.objects.using(db).filter(course_id=course_id).delete()
+            CLOSummary.objects.using(db).filter(course_id=course_id).delete()
 
-# ✅ Reset all CLOs (and description) in both DBs
-def reset_clo_ksec_map(request, curriculum_id, course_id):
-    for db in ['real', 'default']:
-        CLO.objects.using(db).filter(course_id=course_id).delete()
-        CLOSummary.objects.using(db).filter(course_id=course_id).delete()
+            clos = CLO.objects.using(db).bulk_create([
+                CLO(course_id=course_id, index=clo['index'], clo=clo['clo'], bloom=clo['bloom'],
+                    k=clo['k'], s=clo['s'], e=clo['e'], c=clo['c'])
+                for clo in clo_list
+            ])
 
-    for db in ['real', 'default']:
-        course = get_object_or_404(Course.objects.using(db), id=course_id)
-        course.description = ""
-        course.save(using=db)
+            # bulk_create skips CLO.save() → write the KSEC links here
+            code_map = ksec_code_map(db, curriculum_id)
+            CLOKSEC.objects.using(db).bulk_create([
+                CLOKSEC(clo_id=clo.id, ksec_item_id=code_map[code])
+                for clo in clos
+                for code in parse_ksec_codes(','.join(getattr(clo, f) or '' for f in CLO.KSEC_FIELDS))
+                if code in code_map
+            ])
 
-    messages.success(request, "♻️ Reset CLO–KSEC completed (Real + Example).")
-    return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
+            if with_summary:
+                # Coverage comes from Real's links and is stored the same on both sides
+                if percents is None:
+                    percents = get_ksec_coverage(db, course_id)
+                CLOSummary.objects.using(db).create(course_id=course_id, bloom_score=bloom_score, **percents)
+
+            Course.objects.using(db).filter(id=course_id).update(description=course_description)
+
+            # Rebuild the summaries of this course's PLOs
+            refresh_plo_summaries(db, curriculum_id, course_plo_tags(db, [course_id]))
 
 
 def save_clo_ksec_to_session(request, curriculum_id, course_id):
@@ -331,60 +340,17 @@ def save_clo_ksec_to_session(request, curriculum_id, course_id):
     return redirect('clo_ksec_map', curriculum_id=curriculum_id, course_id=course_id)
 
 
+# ✅ Parse the CLO form (each column read once); missing cells become ''
 def build_clo_list_from_post(request):
-    total = len(request.POST.getlist('clo[]'))
+    columns = {key: request.POST.getlist(f'{key}[]') for key in ('clo', 'bloom', 'k', 's', 'e', 'c')}
     clo_list = []
 
-    for i in range(total):
-        clo_text = strip_clo_prefix(request.POST.getlist('clo[]')[i])
+    for i, clo_text in enumerate(columns['clo']):
         clo_data = {
-            'bloom': request.POST.getlist('bloom[]')[i],
-            'k': request.POST.getlist('k[]')[i],
-            's': request.POST.getlist('s[]')[i],
-            'e': request.POST.getlist('e[]')[i],
-            'c': request.POST.getlist('c[]')[i],
+            key: values[i] if i < len(values) else ''
+            for key, values in columns.items() if key != 'clo'
         }
-        clo_full_text = f"CLO{i+1}: {clo_text}"
+        clo_full_text = f"CLO{i+1}: {strip_clo_prefix(clo_text)}"
         clo_list.append({'index': i+1, 'clo': clo_full_text, **clo_data})
 
     return clo_list
-
-
-def Xshould_sync_course(course_id):
-    try:
-        # Check that the course exists in the example DB at least by ID
-        if not Course.objects.using('default').filter(id=course_id).exists():
-            print("[SYNC NEEDED] Course id", course_id, "not found in default DB")
-            return True
-        return False
-    except Exception as e:
-        print("[should_sync_course ERROR]", e)
-        return True
-
-
-def should_sync_course(course_id):
-    try:
-        real = Course.objects.using('real').get(id=course_id)
-        try:
-            default = Course.objects.using('default').get(id=course_id)
-        except Course.DoesNotExist:
-            print("[SYNC NEEDED] Course id", course_id, "not found in default DB")
-            return True
-
-        # Compare core fields (ignore credit_row_id)
-        for f in ['course_code', 'course_name', 'credits', 'curriculum_id', 'semester', 'plo']:
-            print(f"CHECK {f}: real={getattr(real, f, None)}, default={getattr(default, f, None)}")
-            if getattr(real, f, None) != getattr(default, f, None):
-                print(f"[SYNC NEEDED] Mismatch on {f}")
-                return True
-
-        # Ensure parent curriculum exists in default
-        if not Curriculum.objects.using('default').filter(id=real.curriculum_id).exists():
-            print("[SYNC NEEDED] Curriculum id", real.curriculum_id, "not found in default DB")
-            return True
-
-        print("[NO SYNC NEEDED] Everything matched")
-        return False
-    except Exception as e:
-        print("[should_sync_course ERROR]", e)
-        return True
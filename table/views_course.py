@@ -1,11 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import CreditRow, Course, Curriculum
 from django.contrib import messages
+from .plo_summaries import course_plo_tags, refresh_plo_summaries
+from .readonly import VIEW_DB
+from .write_queue import serialize_writes
 
 def course_list(request, curriculum_id, row_id, semester):
     # access mode
     mode = request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
     readonly = (mode != 'edit')
 
     curriculum = get_object_or_404(Curriculum.objects.using(db), id=curriculum_id)
@@ -60,6 +63,7 @@ def course_list(request, curriculum_id, row_id, semester):
     })
 
 
+@serialize_writes
 def save_course_list(request, curriculum_id, row_id, semester):
     mode = request.session.get('access_mode', 'view')
     if mode != 'edit':
@@ -80,6 +84,9 @@ def save_course_list(request, curriculum_id, row_id, semester):
             messages.warning(request, "⚠️ No course code provided.")
             return redirect('course_list', curriculum_id=curriculum_id, row_id=row_id, semester=semester)
 
+        # PLOs whose summary changes: the ones these courses had before and after the save
+        touched_plos = set(plos)
+
         if row_id == 'free_elective':
             existing_courses = Course.objects.using(db).filter(
                 curriculum=curriculum,
@@ -87,6 +94,7 @@ def save_course_list(request, curriculum_id, row_id, semester):
                 semester=semester
             )
             existing_map = {c.course_code.strip(): c for c in existing_courses}
+            touched_plos |= course_plo_tags(db, [c.id for c in existing_map.values()])
             updated_codes = set()
 
             for code, name, credit, plo in zip(codes, names, credits, plos):
@@ -116,6 +124,8 @@ def save_course_list(request, curriculum_id, row_id, semester):
                 if code_key not in updated_codes:
                     course.delete(using=db)
 
+            refresh_plo_summaries(db, curriculum.id, touched_plos)
+
             messages.success(request, "✅ Saved Free Electives successfully.")
             return redirect('course_list', curriculum_id=curriculum_id, row_id='free_elective', semester=semester)
 
@@ -128,6 +138,7 @@ def save_course_list(request, curriculum_id, row_id, semester):
             semester=semester
         )
         existing_map = {c.course_code.strip(): c for c in existing_courses}
+        touched_plos |= course_plo_tags(db, [c.id for c in existing_map.values()])
         updated_codes = set()
 
         for code, name, credit, plo in zip(codes, names, credits, plos):
@@ -162,11 +173,15 @@ def save_course_list(request, curriculum_id, row_id, semester):
         if plo_name_key in request.POST:
             row.name = request.POST[plo_name_key].strip()
             row.save(using=db)
+            touched_plos = None   # a row was renamed → rebuild every PLO
+
+        refresh_plo_summaries(db, curriculum.id, touched_plos)
 
         messages.success(request, "✅ Saved this category’s course list.")
         return redirect('course_list', curriculum_id=curriculum_id, row_id=row_id, semester=semester)
 
 
+@serialize_writes
 def reset_course_list(request, curriculum_id, row_id, semester):
     mode = request.session.get('access_mode', 'view')
     if mode != 'edit':
@@ -178,18 +193,24 @@ def reset_course_list(request, curriculum_id, row_id, semester):
         curriculum = get_object_or_404(Curriculum.objects.using(db), id=curriculum_id)
 
         if row_id == 'free_elective':
-            Course.objects.using(db).filter(
+            courses = Course.objects.using(db).filter(
                 curriculum=curriculum,
                 category='free_elective',
                 semester=semester
-            ).delete()
+            )
+            touched_plos = course_plo_tags(db, courses.values('id'))
+            courses.delete()
+            refresh_plo_summaries(db, curriculum.id, touched_plos)
             return redirect('course_list', curriculum_id=curriculum_id, row_id='free_elective', semester=semester)
 
         row = get_object_or_404(CreditRow.objects.using(db), curriculum=curriculum, id=row_id)
-        Course.objects.using(db).filter(
+        courses = Course.objects.using(db).filter(
             curriculum=curriculum,
             credit_row=row,
             semester=semester
-        ).delete()
+        )
+        touched_plos = course_plo_tags(db, courses.values('id'))
+        courses.delete()
+        refresh_plo_summaries(db, curriculum.id, touched_plos)
 
         return redirect('course_list', curriculum_id=curriculum_id, row_id=row_id, semester=semester)
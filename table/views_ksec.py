@@ -1,6 +1,10 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Curriculum, KSECItem
+from .models import Curriculum, KSECItem, relink_ksec_items
+from .plo_summaries import refresh_plo_summaries
+from .ksec_cache import bump_ksec_version
 from django.db import transaction
+from .readonly import VIEW_DB
+from .write_queue import serialize_writes
 
 TYPE_MAP = {
     'K': 'Knowledge',
@@ -9,6 +13,7 @@ TYPE_MAP = {
     'C': 'Character',
 }
 
+@serialize_writes
 def ksec_edit(request, curriculum_id, semester, type):
     # Validate type
     if type not in TYPE_MAP:
@@ -18,7 +23,7 @@ def ksec_edit(request, curriculum_id, semester, type):
 
     # Respect access mode and choose the database
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     curriculum = get_object_or_404(Curriculum.objects.using(db), pk=curriculum_id)
 
@@ -74,6 +79,12 @@ def ksec_edit(request, curriculum_id, semester, type):
                 type=type
             ).exclude(id__in=keep_ids).delete()
 
+            # Codes follow sort_order → drop cached dictionaries, re-point Course/CLO links
+            bump_ksec_version(db, curriculum.id)
+            relink_ksec_items(db, curriculum.id)
+            # KSEC labels appear in every PLO summary
+            refresh_plo_summaries(db, curriculum.id)
+
         return redirect('ksec_edit', curriculum_id=curriculum_id, semester=semester, type=type)
 
     # Build "Year/Term" label, e.g. "1/1", "1/2", ..., "4/2"
@@ -1,5 +1,7 @@
 from django.shortcuts import render, get_object_or_404
-from .models import Curriculum, KSECItem
+from .models import Curriculum
+from .ksec_cache import ksec_dictionary
+from .readonly import VIEW_DB
 
 TYPE_MAP = {
     'K': 'Knowledge',
@@ -21,20 +23,13 @@ def ksec_item_select(request, curriculum_id):
 
     # Respect access mode and choose database
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     curriculum = get_object_or_404(Curriculum.objects.using(db), id=curriculum_id)
 
-    # Load items (semester-agnostic) and generate codes
-    raw_items = list(KSECItem.objects.using(db).filter(
-        curriculum=curriculum,
-        semester=0,        # shared across semesters
-        type=ksec_type
-    ).order_by('sort_order', 'id'))
-
-    for idx, item in enumerate(raw_items):
-        # e.g., GE(K)1, CE(S)2, ...
-        item.code = f"{item.category_type}({ksec_type}){idx + 1}"
+    # Items (semester-agnostic) with their codes, e.g. GE(K)1, CE(S)2, from the cached KSEC dictionary
+    ksec = ksec_dictionary(db, curriculum.id, curriculum.ksec_version)
+    raw_items = [item for item in ksec.by_type.get(ksec_type, []) if item.semester == 0]
 
     # Build "Year X / Term Y"
     sem = int(semester)
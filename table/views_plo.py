@@ -1,7 +1,9 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Sum
 from .models import CreditRow, Course, YLOPerPLOSemester
+from .aggregates import CreditMatrix, plo_row_tag
 from django.contrib import messages
+from .readonly import VIEW_DB
+from .write_queue import serialize_writes
 
 def convert_semester(sem: int) -> str:
     """Return 'Year/Term' like '1/1', '1/2', ... '4/2'."""
@@ -12,47 +14,32 @@ def convert_semester(sem: int) -> str:
 def plo_course_list(request, curriculum_id, row_id, semester):
     # respect explicit ?mode= or fallback to session
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
+
+    matrix = CreditMatrix(curriculum_id, db)
 
     # current PLO row
     plo_row = get_object_or_404(CreditRow.objects.using(db), id=row_id, curriculum_id=curriculum_id)
-    plo_label = plo_row.name.split()[0] if plo_row.name else ''
+    plo_label = plo_row_tag(plo_row)
 
     # courses that match this PLO in the selected semester
     matching_courses = Course.objects.using(db).filter(
         curriculum_id=curriculum_id,
         semester=semester,
-        plo=plo_label,
+        plo_links__plo=plo_label,
     ).order_by('course_code')
 
     total_credits = sum(course.credits for course in matching_courses)
 
     # total credits for this PLO across all semesters
-    total_credits_all = Course.objects.using(db).filter(
-        curriculum_id=curriculum_id,
-        plo=plo_label
-    ).aggregate(Sum('credits'))['credits__sum'] or 0
+    total_credits_all = matrix.plo_total(plo_label)
 
     percent_of_total = round((total_credits / total_credits_all) * 100, 2) if total_credits_all else 0
 
     semester_str = convert_semester(semester)
 
     # Determine YLO index for this semester (only rows with non-zero credits count)
-    all_plo_rows = CreditRow.objects.using(db).filter(
-        curriculum_id=curriculum_id,
-        row_type='plo'
-    ).order_by('id')
-
-    non_zero_rows = []
-    for row in all_plo_rows:
-        label = row.name.split()[0] if row.name else ''
-        credits = Course.objects.using(db).filter(
-            curriculum_id=curriculum_id,
-            semester=semester,
-            plo=label,
-        ).aggregate(Sum('credits'))['credits__sum'] or 0
-        if credits > 0:
-            non_zero_rows.append(row)
+    non_zero_rows = matrix.plo_rows_with_credits(semester)
 
     try:
         ylo_number = non_zero_rows.index(plo_row) + 1
@@ -77,11 +64,11 @@ def plo_course_list(request, curriculum_id, row_id, semester):
         'ylo_number': ylo_number,
     })
 
+@serialize_writes
 def save_plo_course_list(request, curriculum_id, row_id, semester):
     if request.method == 'POST':
         summary_text = (request.POST.get('summary_text') or '').strip()
-        plo_name = get_object_or_404(CreditRow.objects.using('real'), id=row_id).name
-        plo_label = plo_name.split()[0] if plo_name else ''
+        plo_label = plo_row_tag(get_object_or_404(CreditRow.objects.using('real'), id=row_id))
 
         YLOPerPLOSemester.objects.using('real').update_or_create(
             curriculum_id=curriculum_id,
@@ -1,6 +1,8 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import Curriculum, Course, YLOPerPLOSemester
 from django.contrib import messages
+from .readonly import VIEW_DB
+from .write_queue import serialize_writes
 
 # Convert semester index (1..8) to "Year/Term" like "1/1", "1/2", ..., "4/2"
 def convert_semester(sem: int) -> str:
@@ -11,7 +13,7 @@ def convert_semester(sem: int) -> str:
 # YLO Study Plan page
 def ylo_study_plan(request, curriculum_id, semester):
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     curriculum = get_object_or_404(Curriculum.objects.using(db), id=curriculum_id)
 
@@ -48,9 +50,10 @@ def ylo_study_plan(request, curriculum_id, semester):
     })
 
 # Save K/S/E/C values into Course
+@serialize_writes
 def save_ylo_studyplan(request, curriculum_id, semester):
     mode = request.GET.get('mode') or request.session.get('access_mode', 'view')
-    db = 'real' if mode == 'edit' else 'default'
+    db = 'real' if mode == 'edit' else VIEW_DB
 
     if request.method == 'POST' and mode == 'edit':
         curriculum = get_object_or_404(Curriculum.objects.using(db), id=curriculum_id)
@@ -73,24 +76,23 @@ def update_ylo_for_curriculum(curriculum):
     Ensure YLO records exist only for PLOs that actually have credits
     in each semester; delete YLOs whose PLO has no credited courses.
     """
-    from .models import Course, YLOPerPLOSemester
-
-    for sem in range(1, 9):
-        plo_with_credits = set()
-        courses = Course.objects.using('real').filter(curriculum=curriculum, semester=sem)
-
-        for course in courses:
-            if not course.plo:
-                continue
-            plo_tag = course.plo.split(':')[0].strip()
-            if plo_tag and course.credits and course.credits > 0:
-                plo_with_credits.add(plo_tag)
-
-        # Delete YLOs for PLOs that have no credited courses in this semester
-        for ylo in YLOPerPLOSemester.objects.using('real').filter(curriculum=curriculum, semester=sem):
-            ylo_plo_tag = ylo.plo.strip().split(":")[0].strip() if ylo.plo else ''
-            if ylo_plo_tag not in plo_with_credits:
-                ylo.delete()
-            else:
-                # keep
-                pass
+    from .models import CoursePLO, YLOPerPLOSemester, parse_plo_tags
+
+    # (semester, PLO tag) pairs with at least one credited course
+    plo_with_credits = set(
+        CoursePLO.objects.using('real').filter(
+            curriculum=curriculum,
+            course__credits__gt=0,
+        ).values_list('course__semester', 'plo').distinct()
+    )
+
+    # Delete YLOs for PLOs that have no credited courses in their semester
+    stale_ids = []
+    for ylo in YLOPerPLOSemester.objects.using('real').filter(curriculum=curriculum, semester__range=(1, 8)):
+        tags = parse_plo_tags(ylo.plo)
+        ylo_plo_tag = tags[0] if tags else ''
+        if (ylo.semester, ylo_plo_tag) not in plo_with_credits:
+            stale_ids.append(ylo.id)
+
+    if stale_ids:
+        YLOPerPLOSemester.objects.using('real').filter(id__in=stale_ids).delete()
@@ -0,0 +1,213 @@
+"""
+Cross-process write queue, one per curriculum.
+
+SQLite lets one connection write a file at a time. Without coordination,
+workers saving the same curriculum race for real.sqlite3 and the losers
+fail with "database is locked" once busy_timeout runs out. Views decorated
+with @serialize_writes instead take their turn, first come first served,
+across every worker process on the host:
+
+- a waiter holds a flock on its ticket file, <DIR>/<curriculum>/<time>-<pid>-<thread>.wait,
+  while it waits, so the ticket of a crashed waiter is seen as stale and removed;
+- the owner of the oldest live ticket takes the curriculum's lock file
+  (<DIR>/<curriculum>.lock, flock) and runs the view;
+- a waiter gives up after TIMEOUT seconds, and a request finding MAX_WAITERS
+  tickets already queued is refused at once. Both get a 503 with Retry-After.
+
+Queue depth and wait time go into the request log (RequestMetricsMiddleware)
+and, per process, into write_queue_stats().
+"""
+
+import fcntl
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+
+DEFAULT_WRITE_QUEUE = {
+    'DIR': None,          # lock and ticket files; None → BASE_DIR / 'write-locks'
+    'TIMEOUT': 10,        # seconds a request waits for its turn
+    'MAX_WAITERS': 8,     # tickets per curriculum before new writes are refused
+    'POLL_MS': 10,        # how often a waiter checks whether it is first
+    'RETRY_AFTER': 2,     # seconds, sent with the 503
+}
+
+_held = threading.local()     # curricula whose lock this thread holds (nested use is a no-op)
+_lock = threading.Lock()
+_stats = {'acquired': 0, 'timeouts': 0, 'rejected': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0, 'max_depth': 0}
+
+
+class WriteBusy(Exception):
+    """The curriculum's write queue is full, or the turn did not come within TIMEOUT."""
+
+    def __init__(self, reason, depth, wait_ms):
+        super().__init__(
+            f"Curriculum is busy saving other changes ({reason}, {depth} waiting); please retry."
+        )
+        self.reason = reason
+        self.depth = depth
+        self.wait_ms = wait_ms
+
+
+def queue_settings():
+    return {**DEFAULT_WRITE_QUEUE, **getattr(settings, 'WRITE_QUEUE', {})}
+
+
+def queue_root(options):
+    return Path(options['DIR'] or Path(settings.BASE_DIR) / 'write-locks')
+
+
+def live_tickets(directory):
+    """Ticket file names in arrival order. Tickets nobody holds (dead waiters) are removed."""
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith('.wait'))
+    except FileNotFoundError:
+        return []
+    tickets = []
+    for name in names:
+        try:
+            fd = os.open(directory / name, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            tickets.append(name)      # its waiter is alive
+        else:
+            (directory / name).unlink(missing_ok=True)
+        finally:
+            os.close(fd)
+    return tickets
+
+
+def record(outcome, depth, wait_ms):
+    with _lock:
+        _stats[outcome] += 1
+        _stats['max_depth'] = max(_stats['max_depth'], depth)
+        if outcome == 'acquired':
+            _stats['wait_ms_total'] += wait_ms
+            _stats['wait_ms_max'] = max(_stats['wait_ms_max'], wait_ms)
+
+
+@contextmanager
+def curriculum_write_lock(curriculum_id):
+    """
+    Hold the curriculum's write lock for the block; yields {'depth', 'wait_ms'}
+    (tickets ahead on arrival, time spent waiting). Raises WriteBusy.
+    """
+    held = _held.__dict__.setdefault('curricula', set())
+    if curriculum_id in held:
+        yield {'depth': 0, 'wait_ms': 0.0}
+        return
+
+    options = queue_settings()
+    directory = queue_root(options) / str(curriculum_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    depth = len(live_tickets(directory))
+    if depth >= options['MAX_WAITERS']:
+        record('rejected', depth, 0.0)
+        raise WriteBusy('queue full', depth, 0.0)
+
+    # lock the ticket before it becomes visible, so nobody takes it for a stale one
+    name = f'{time.time_ns():020d}-{os.getpid()}-{threading.get_ident()}'
+    ticket = directory / f'{name}.wait'
+    ticket_fd = os.open(directory / f'{name}.tmp', os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+    fcntl.flock(ticket_fd, fcntl.LOCK_EX)
+    os.rename(directory / f'{name}.tmp', ticket)
+
+    lock_fd = os.open(directory.with_suffix('.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    acquired = False
+    try:
+        deadline = started + options['TIMEOUT']
+        while True:
+            tickets = live_tickets(directory)
+            if tickets and tickets[0] == ticket.name:
+                try:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    pass      # the previous writer is still running
+            if time.perf_counter() >= deadline:
+                wait_ms = (time.perf_counter() - started) * 1000
+                record('timeouts', depth, wait_ms)
+                ahead = tickets.index(ticket.name) if ticket.name in tickets else len(tickets)
+                raise WriteBusy('timed out', ahead, wait_ms)
+            time.sleep(options['POLL_MS'] / 1000)
+
+        # our turn: leave the queue so the next waiter lines up behind the lock
+        ticket.unlink(missing_ok=True)
+        os.close(ticket_fd)
+        ticket_fd = None
+        wait_ms = (time.perf_counter() - started) * 1000
+        record('acquired', depth, wait_ms)
+
+        held.add(curriculum_id)
+        try:
+            yield {'depth': depth, 'wait_ms': wait_ms}
+        finally:
+            held.discard(curriculum_id)
+    finally:
+        if ticket_fd is not None:
+            ticket.unlink(missing_ok=True)
+            os.close(ticket_fd)
+        if acquired:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
+
+
+def serialize_writes(view):
+    """
+    Run the view's POSTs under the write lock of its `curriculum_id`; answer
+    503 + Retry-After when the queue is busy. Sets request.write_queue for
+    the request log.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return view(request, *args, **kwargs)
+
+        curriculum_id = kwargs['curriculum_id']
+        try:
+            with curriculum_write_lock(curriculum_id) as waited:
+                request.write_queue = {'curriculum': curriculum_id, 'outcome': 'acquired',
+                                       'depth': waited['depth'], 'wait_ms': round(waited['wait_ms'], 1)}
+                return view(request, *args, **kwargs)
+        except WriteBusy as e:
+            request.write_queue = {'curriculum': curriculum_id, 'outcome': e.reason,
+                                   'depth': e.depth, 'wait_ms': round(e.wait_ms, 1)}
+            response = HttpResponse(str(e), status=503, content_type='text/plain')
+            response['Retry-After'] = queue_settings()['RETRY_AFTER']
+            return response
+    return wrapper
+
+
+def write_queue_stats():
+    """This process's lock statistics, plus the tickets currently queued (all processes)."""
+    with _lock:
+        stats = dict(_stats)
+    acquired = stats.pop('acquired')
+    total = stats.pop('wait_ms_total')
+    root = queue_root(queue_settings())
+    waiting = {}
+    if root.is_dir():
+        for directory in root.iterdir():
+            if directory.is_dir():
+                depth = len(live_tickets(directory))
+                if depth:
+                    waiting[directory.name] = depth
+    return {
+        'acquired': acquired,
+        **stats,
+        'wait_ms_mean': round(total / acquired, 1) if acquired else None,
+        'wait_ms_max': round(stats['wait_ms_max'], 1),
+        'waiting': waiting,
+    }